@@ -0,0 +1,92 @@
+import heapq
+
+"""
+The AdmissionQueue class holds processes that could not be placed when they arrived, until a departure frees enough memory to place them
+waiting processes are admitted in the order they started waiting; the size of the smallest waiting process is kept in a heap, so that a
+departure that cannot have made room for any of them is dismissed without looking through the queue at all
+"""
+class AdmissionQueue():
+    """
+    AdmissionQueue constructor: creates a new, empty queue
+    """
+    def __init__(self):
+        #dict of pid:(process, index of the arrival/run pair it is waiting to run, time at which it started waiting), in the order they started waiting
+        self.waiting = {}
+        #heap of (memSize, pid) for every waiting process; entries for processes that have since left the queue are discarded lazily
+        self.sizes = []
+        #running totals used to report how well the queue is doing
+        self.admittedCount = 0
+        self.expiredCount = 0
+        self.totalWait = 0
+        self.maxWait = 0
+        self.maxDepth = 0
+
+    """
+    check whether the specified process is waiting in the queue
+    @param pid: the pid of the process
+    """
+    def __contains__(self, pid):
+        return pid in self.waiting
+
+    """
+    get the number of processes waiting in the queue
+    """
+    def __len__(self):
+        return len(self.waiting)
+
+    """
+    add a process to the back of the queue
+    @param process: the process that could not be placed
+    @param pairIndex: the index of the arrival/run pair the process is waiting to run
+    @param time: the time at which the process started waiting
+    """
+    def add(self, process, pairIndex, time):
+        self.waiting[process.pid] = (process, pairIndex, time)
+        heapq.heappush(self.sizes, (process.memSize, process.pid))
+        self.maxDepth = max(self.maxDepth, len(self.waiting))
+
+    """
+    get the size of the smallest waiting process
+    @returns the number of frames needed by the smallest waiting process, or None if the queue is empty
+    """
+    def getSmallestSize(self):
+        #drop entries left behind by processes that are no longer waiting
+        while (self.sizes and self.sizes[0][1] not in self.waiting):
+            heapq.heappop(self.sizes)
+        return self.sizes[0][0] if self.sizes else None
+
+    """
+    get every waiting entry that needs no more than the specified number of frames, in the order they started waiting
+    @param maxSize: the largest number of frames a process may need to be returned
+    @returns a list of (process, pair index, time at which it started waiting) entries
+    """
+    def getCandidates(self, maxSize):
+        return [entry for entry in self.waiting.values() if entry[0].memSize <= maxSize]
+
+    """
+    remove a process from the queue because it has been placed
+    @param pid: the pid of the process
+    @param time: the time at which the process was placed
+    @returns how long (in milliseconds) the process waited
+    """
+    def admit(self, pid, time):
+        waitTime = time - self.waiting.pop(pid)[2]
+        self.admittedCount += 1
+        self.totalWait += waitTime
+        self.maxWait = max(self.maxWait, waitTime)
+        return waitTime
+
+    """
+    remove a process from the queue without placing it, because it will never run the pair it was waiting for
+    @param pid: the pid of the process
+    @returns the (process, pair index, time at which it started waiting) entry that was removed
+    """
+    def expire(self, pid):
+        self.expiredCount += 1
+        return self.waiting.pop(pid)
+
+    """
+    get the mean time (in milliseconds) that admitted processes spent waiting
+    """
+    def getMeanWait(self):
+        return self.totalWait / self.admittedCount if self.admittedCount > 0 else 0.0
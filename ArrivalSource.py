@@ -0,0 +1,120 @@
+import heapq
+
+"""
+ArrivalOrderError is raised when a process arrives before arrivals that have already been handed out, i.e. the input is further out of order
+than the lookahead allows
+"""
+class ArrivalOrderError(Exception):
+    pass
+
+"""
+The ArrivalSource class feeds process arrivals to the Simulator lazily, in order of arrival time
+processes are pulled from an iterable only when they are needed, so a trace never has to be held in memory all at once
+"""
+class ArrivalSource():
+    """
+    ArrivalSource constructor: create a new source of arrivals for the specified processes
+    @param processes: an iterable of processes (a list, or a generator reading from a file)
+    @param lookahead: how many processes to read ahead when the input is not sorted by first arrival time;
+                      1 requires the input to be sorted, and None reads the entire input up front
+    """
+    def __init__(self, processes, lookahead=None):
+        self.processes = iter(processes)
+        self.lookahead = lookahead
+        #processes that have been read but not yet released, as (first arrival time, read order, process)
+        self.buffered = []
+        #arrivals of released processes that have not yet been handed out, as (arrival time, read order, pair index, process)
+        self.pending = []
+        self.readCount = 0
+        #number of processes taken from the input, including those with no arrivals
+        self.consumedCount = 0
+        self.exhausted = False
+        self.lastTime = 0
+
+    """
+    get the state to save when this source is pickled for a checkpoint
+    the input itself cannot be saved, and processes that are still buffered have not been touched by the run, so only their places in the
+    input are saved; resumeFrom reads them again
+    """
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['processes']
+        state['buffered'] = [(firstArrival, order) for firstArrival, order, proc in self.buffered]
+        return state
+
+    """
+    reattach a source restored from a checkpoint to its input, reading back the processes it had already taken from it
+    @param processes: an iterable of processes yielding the same processes, in the same order, as the one this source was created with
+    """
+    def resumeFrom(self, processes):
+        self.processes = iter(processes)
+        bufferedOrders = {order: firstArrival for firstArrival, order in self.buffered}
+        self.buffered = []
+        order = 0
+        for i in range(self.consumedCount):
+            proc = next(self.processes)
+            if (len(proc.arrivalRunPairs) > 0):
+                #processes already released live on in the restored run; only the buffered ones are taken from the input again
+                if (order in bufferedOrders):
+                    self.buffered.append((bufferedOrders[order], order, proc))
+                order += 1
+        heapq.heapify(self.buffered)
+
+    """
+    read processes from the input until we hold lookahead of them, or the input runs out
+    """
+    def refill(self):
+        while (not self.exhausted and (self.lookahead == None or len(self.buffered) < self.lookahead)):
+            proc = next(self.processes, None)
+            if (proc == None):
+                self.exhausted = True
+                continue
+            self.consumedCount += 1
+            if (len(proc.arrivalRunPairs) > 0):
+                heapq.heappush(self.buffered, (min(pair[0] for pair in proc.arrivalRunPairs), self.readCount, proc))
+                self.readCount += 1
+
+    """
+    make sure the earliest outstanding arrival is at the front of the pending heap
+    @returns whether there are any arrivals left (true) or not (false)
+    """
+    def advance(self):
+        self.refill()
+        #release buffered processes until none of them could arrive before the earliest pending arrival
+        while (self.buffered and (not self.pending or self.buffered[0][0] <= self.pending[0][0])):
+            firstArrival, order, proc = heapq.heappop(self.buffered)
+            if (firstArrival < self.lastTime):
+                raise ArrivalOrderError("process {0} arrives at {1}ms, after arrivals at {2}ms were already simulated; "
+                                 "increase the lookahead or sort the input by arrival time".format(proc.pid, firstArrival, self.lastTime))
+            for i in range(len(proc.arrivalRunPairs)):
+                heapq.heappush(self.pending, (proc.arrivalRunPairs[i][0], order, i, proc))
+            self.refill()
+        return len(self.pending) > 0
+
+    """
+    get the time of the next arrival without consuming it
+    @returns the time of the next arrival, or None if there are no arrivals left
+    """
+    def peekTime(self):
+        if (not self.advance()):
+            return None
+        return self.pending[0][0]
+
+    """
+    get the next arrival without consuming it
+    @returns a (time, process) pair for the next arrival, or None if there are no arrivals left
+    """
+    def peek(self):
+        if (not self.advance()):
+            return None
+        return (self.pending[0][0], self.pending[0][3])
+
+    """
+    consume the next arrival
+    @returns a (time, process) pair for the next arrival
+    """
+    def next(self):
+        self.advance()
+        time, order, pairIndex, proc = heapq.heappop(self.pending)
+        self.lastTime = time
+        return (time, proc)
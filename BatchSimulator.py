@@ -0,0 +1,263 @@
+import argparse
+import io
+import sys
+import time
+from Event import EventType
+from MemoryStore import MemoryAlgorithm
+from Output import OutputLevel, OutputWriter
+from Simulator import Simulator
+from TraceGenerator import TraceGenerator
+#NumPy is only needed by the batched simulator, so the rest of the project runs without it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#event type stored after the last event of a trace that has fewer events than the longest trace in the batch
+NO_EVENT = 0
+
+"""
+The BatchSimulator class simulates many independent traces at once, holding their memory stores as the rows of a single 2-D array
+every trace uses the same memory configuration; at each step, every trace processes its next event, with hole finding, defragmentation and
+paged frame allocation done by array operations across all the traces that need them at that step
+this works because the order of a trace's events never depends on what happens to memory: events are stored relative to the total time
+spent defragmenting (see Simulator.timeOffset), so a departure is always stored at its arrival time plus its run time. the only thing a
+placement decides is whether that departure happens at all
+"""
+class BatchSimulator():
+    """
+    BatchSimulator constructor: prepare the events of every trace in the batch
+    @param traces: a list of traces, each a list of ProcessSpecs
+    @param algo: the MemoryAlgorithm used for contiguous placement (firstFit or bestFit; ignored when non-contiguous)
+    @param contiguous: whether memory is allocated contiguously (true) or through a page table (false)
+    @param numFrames: the number of frames in each memory store
+    @param t_memmove: the time (in milliseconds) it takes to move one frame of memory during defragmentation
+    """
+    def __init__(self, traces, algo=MemoryAlgorithm.bestFit, contiguous=True, numFrames=256, t_memmove=1):
+        if (np == None):
+            raise ImportError("the batched simulator requires NumPy (pip install numpy)")
+        if (contiguous and algo not in (MemoryAlgorithm.firstFit, MemoryAlgorithm.bestFit)):
+            raise ValueError("the batched simulator supports first-fit, best-fit and non-contiguous memory")
+        self.algo = algo
+        self.contiguous = contiguous
+        self.numFrames = numFrames
+        self.t_memmove = t_memmove
+        self.buildEvents(traces)
+
+    """
+    build the events of a single trace, in the order the Simulator would process them
+    @param specs: the ProcessSpecs of the trace
+    @returns a list of (time, event type, process index, arrival index) tuples, sorted, and a list of the size of each process
+    """
+    def getTraceEvents(self, specs):
+        #rank pids in string order, so that ties are broken the same way as Event.__lt__
+        pidRank = {pid: rank for rank, pid in enumerate(sorted(set(spec.pid for spec in specs)))}
+        events = []
+        numArrivals = 0
+        for procIndex in range(len(specs)):
+            spec = specs[procIndex]
+            #arrivals are handed out in time order, and each one runs for the run time of the next pair, as in Simulator.handleSwitchIn
+            arrivals = sorted(pair[0] for pair in spec.arrivalRunPairs)
+            prevEnd = None
+            for i in range(len(arrivals)):
+                if (prevEnd != None and arrivals[i] < prevEnd):
+                    raise ValueError("process {0} arrives again before its previous run has ended".format(spec.pid))
+                prevEnd = arrivals[i] + spec.arrivalRunPairs[i][1]
+                rank = pidRank[spec.pid]
+                events.append((arrivals[i], EventType.SwitchIn.value, rank, procIndex, numArrivals, 0, EventType.SwitchIn.value))
+                if (prevEnd == arrivals[i]):
+                    #a departure is only queued once its arrival is placed, so a run of 0ms departs straight after arriving
+                    events.append((arrivals[i], EventType.SwitchIn.value, rank, procIndex, numArrivals, 1, EventType.SwitchOut.value))
+                else:
+                    events.append((prevEnd, EventType.SwitchOut.value, rank, procIndex, numArrivals, 0, EventType.SwitchOut.value))
+                numArrivals += 1
+        events.sort()
+        return [(event[0], event[6], event[3], event[4]) for event in events], [spec.memSize for spec in specs]
+
+    """
+    build the padded event arrays of the whole batch
+    @param traces: a list of traces, each a list of ProcessSpecs
+    """
+    def buildEvents(self, traces):
+        built = [self.getTraceEvents(specs) for specs in traces]
+        self.numTraces = len(traces)
+        numEvents = max([len(events) for events, sizes in built] + [0])
+        numProcs = max([len(sizes) for events, sizes in built] + [1])
+        #one row per trace: the time, type, process index and arrival index of each event, followed by NO_EVENT padding
+        self.eventTime = np.zeros((self.numTraces, numEvents), np.int64)
+        self.eventType = np.full((self.numTraces, numEvents), NO_EVENT, np.int8)
+        self.eventProc = np.zeros((self.numTraces, numEvents), np.int32)
+        self.eventArrival = np.zeros((self.numTraces, numEvents), np.int32)
+        self.procSize = np.zeros((self.numTraces, numProcs), np.int64)
+        self.numArrivals = max([len(events)//2 for events, sizes in built] + [1])
+        for row in range(self.numTraces):
+            events, sizes = built[row]
+            if (events):
+                columns = np.array(events, np.int64)
+                self.eventTime[row, :len(events)] = columns[:,0]
+                self.eventType[row, :len(events)] = columns[:,1]
+                self.eventProc[row, :len(events)] = columns[:,2]
+                self.eventArrival[row, :len(events)] = columns[:,3]
+            self.procSize[row, :len(sizes)] = sizes
+
+    """
+    find a hole for each of the specified stores, using first-fit or best-fit
+    @param free: a boolean array with one row of free frames per store
+    @param sizes: the number of frames required in each store
+    @returns the location chosen in each store, or -1 where no hole is large enough
+    """
+    def findHoles(self, free, sizes):
+        numRows, numFrames = free.shape
+        width = numFrames + 2
+        #surround each row with used frames, so that the holes of one row never run into the next once the rows are laid end to end
+        padded = np.zeros((numRows, width), np.int8)
+        padded[:,1:-1] = free
+        edges = np.diff(padded.ravel())
+        starts = np.nonzero(edges == 1)[0] + 1
+        ends = np.nonzero(edges == -1)[0] + 1
+        rows = starts // width
+        holeStarts = starts % width - 1
+        holeLengths = ends - starts
+
+        #pick each row's first (or smallest, then lowest) hole that is big enough
+        valid = holeLengths >= sizes[rows]
+        if (self.algo == MemoryAlgorithm.bestFit):
+            keys = holeLengths * width + holeStarts
+        else:
+            keys = holeStarts
+        noHole = np.iinfo(np.int64).max
+        best = np.full(numRows, noHole, np.int64)
+        np.minimum.at(best, rows[valid], keys[valid])
+        return np.where(best == noHole, -1, best % width)
+
+    """
+    slide every process in the specified stores down to the bottom of memory, as MemoryStore.defragment does
+    @param mem: the memory of the stores to defragment, one row per store
+    @returns the defragmented memory, and the number of frames moved in each store
+    """
+    def defragment(self, mem):
+        #a stable sort that puts used frames first keeps every process in order and in one piece
+        order = np.argsort(mem < 0, axis=1, kind='stable')
+        compacted = np.take_along_axis(mem, order, axis=1)
+        #every frame of a process that moved has changed position; every frame of a process that didn't move has not
+        moved = ((compacted >= 0) & (order != np.arange(mem.shape[1]))).sum(axis=1)
+        return compacted, moved
+
+    """
+    run every trace in the batch
+    @returns a list with one dict per trace, summarizing its run with the same values as getScalarSummary (the counts that Sweep records,
+             without its internal fragmentation or wall-clock time)
+    """
+    def run(self):
+        numRows = self.numTraces
+        mem = np.full((numRows, self.numFrames), -1, np.int32)
+        frameIndex = np.arange(self.numFrames)
+        placedArrivals = np.zeros((numRows, self.numArrivals), bool)
+        timeOffset = np.zeros(numRows, np.int64)
+        lastTime = np.zeros(numRows, np.int64)
+        eventCount = np.zeros(numRows, np.int64)
+        placedCount = np.zeros(numRows, np.int64)
+        skippedCount = np.zeros(numRows, np.int64)
+        defragCount = np.zeros(numRows, np.int64)
+        framesMoved = np.zeros(numRows, np.int64)
+
+        for step in range(self.eventTime.shape[1]):
+            eType = self.eventType[:,step]
+            proc = self.eventProc[:,step]
+            arrival = self.eventArrival[:,step]
+
+            #departures only happen for arrivals that were placed
+            out = np.nonzero((eType == EventType.SwitchOut.value) & placedArrivals[np.arange(numRows), arrival])[0]
+            if (out.size):
+                mem[out] = np.where(mem[out] == proc[out,None], -1, mem[out])
+
+            arriving = np.nonzero(eType == EventType.SwitchIn.value)[0]
+            if (arriving.size):
+                sizes = self.procSize[arriving, proc[arriving]]
+                free = mem[arriving] < 0
+                freeCount = free.sum(axis=1)
+                if (not self.contiguous):
+                    #take the lowest-numbered free frames, wherever they are
+                    placed = freeCount >= sizes
+                    claimed = free & (np.cumsum(free, axis=1) <= sizes[:,None]) & placed[:,None]
+                else:
+                    loc = self.findHoles(free, sizes)
+                    #defragment the stores with no big enough hole but enough free memory in total; the process then fits at the end
+                    needDefrag = (loc == -1) & (freeCount >= sizes)
+                    if (needDefrag.any()):
+                        rows = arriving[needDefrag]
+                        mem[rows], moved = self.defragment(mem[rows])
+                        defragCount[rows] += 1
+                        framesMoved[rows] += moved
+                        timeOffset[rows] += moved * self.t_memmove
+                        #(a store with no free frames at all has no hole to take, even for a process of size 0)
+                        loc[needDefrag] = np.where(freeCount[needDefrag] > 0, self.numFrames - freeCount[needDefrag], -1)
+                    placed = loc != -1
+                    claimed = (frameIndex >= loc[:,None]) & (frameIndex < (loc + sizes)[:,None]) & placed[:,None]
+                mem[arriving] = np.where(claimed, proc[arriving,None], mem[arriving])
+                placedArrivals[arriving[placed], arrival[arriving[placed]]] = True
+                placedCount[arriving] += placed
+                skippedCount[arriving] += ~placed
+
+            processed = np.concatenate((out, arriving))
+            eventCount[processed] += 1
+            lastTime[processed] = self.eventTime[processed, step]
+
+        #the run ends at its last event, pushed back by all of the time spent defragmenting
+        endTime = lastTime + timeOffset
+        return [{"endTime": int(endTime[row]), "events": int(eventCount[row]), "placed": int(placedCount[row]),
+                 "skipped": int(skippedCount[row]), "defragmentations": int(defragCount[row]), "framesMoved": int(framesMoved[row])}
+                for row in range(numRows)]
+
+"""
+summarize a run of the scalar Simulator with the same values that BatchSimulator.run reports for each trace
+@param specs: the ProcessSpecs of the trace
+@param algo: the MemoryAlgorithm used for contiguous placement
+@param contiguous: whether memory is allocated contiguously (true) or through a page table (false)
+@param numFrames: the number of frames in memory
+@param t_memmove: the time (in milliseconds) it takes to move one frame of memory during defragmentation
+@returns a dict summarizing the run
+"""
+def getScalarSummary(specs, algo, contiguous, numFrames, t_memmove):
+    sim = Simulator(specs, algo, contiguous, OutputLevel.summary, OutputWriter(io.StringIO()), numFrames=numFrames, t_memmove=t_memmove)
+    sim.run()
+    return {"endTime": sim.simTime, "events": sim.eventCount, "placed": sim.placedCount, "skipped": sim.skippedCount,
+            "defragmentations": sim.memStore.defragCount, "framesMoved": sim.memStore.framesMoved}
+
+"""
+main method: run a batch of random traces, optionally checking every summary against the scalar Simulator
+"""
+def main():
+    allAlgos = [MemoryAlgorithm.firstFit.name, MemoryAlgorithm.bestFit.name, "nonContiguous"]
+    parser = argparse.ArgumentParser(description="Simulate many random traces at once")
+    parser.add_argument("--traces", type=int, default=1000, help="number of traces in the batch")
+    parser.add_argument("--processes", type=int, default=26, help="number of processes in each trace")
+    parser.add_argument("--algo", choices=allAlgos, default=MemoryAlgorithm.bestFit.name)
+    parser.add_argument("--frames", type=int, default=256)
+    parser.add_argument("--memmove", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first trace; trace i uses seed+i")
+    parser.add_argument("--check", action="store_true", help="also run every trace through the scalar Simulator and compare the results")
+    args = parser.parse_args()
+    if (np == None):
+        print("Error: the batched simulator requires NumPy (pip install numpy)", file=sys.stderr)
+        sys.exit(1)
+
+    contiguous = args.algo != "nonContiguous"
+    algo = MemoryAlgorithm[args.algo] if contiguous else None
+    traces = [list(TraceGenerator(args.seed + i, args.processes, 1, max(2, args.frames // 4)).generateSpecs()) for i in range(args.traces)]
+
+    start = time.perf_counter()
+    results = BatchSimulator(traces, algo, contiguous, args.frames, args.memmove).run()
+    print("batched: {0} traces in {1:.3f}s".format(len(traces), time.perf_counter() - start))
+    for key in ("endTime", "placed", "skipped", "defragmentations", "framesMoved"):
+        print("  mean {0}: {1:.2f}".format(key, sum(r[key] for r in results) / max(1, len(results))))
+
+    if (args.check):
+        start = time.perf_counter()
+        mismatches = 0
+        for specs, result in zip(traces, results):
+            mismatches += getScalarSummary(specs, algo, contiguous, args.frames, args.memmove) != result
+        print("scalar: {0} traces in {1:.3f}s, {2} mismatches".format(len(traces), time.perf_counter() - start, mismatches))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from array import array
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from Process import ProcessSpec, InputFormatError
+
+"""
+binary traces store the same information as our text input files, as packed little-endian uint32 columns:
+    header:     MAGIC, then numProcesses, numPairs and the length of the pid blob (in bytes) as uint32s
+    memSize:    numProcesses entries
+    pairStart:  numProcesses+1 entries; the pairs of process i are entries pairStart[i] to pairStart[i+1]-1 of the next two columns
+    arrival:    numPairs entries
+    runTime:    numPairs entries
+    pidStart:   numProcesses+1 entries; the pid of process i is bytes pidStart[i] to pidStart[i+1]-1 of the pid blob
+    pid blob:   the utf-8 pids of every process, concatenated
+"""
+MAGIC = b'P2TRACE1'
+HEADER = struct.Struct('<8sIII')
+
+"""
+check whether the specified file is a binary trace
+@param fileName: the name of the file to check
+@returns whether the file begins with the binary trace MAGIC (true) or not (false)
+"""
+def isBinaryTrace(fileName):
+    with open(fileName, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+"""
+The BinaryTraceReader class reads a binary trace through mmap
+nothing is parsed up front: each column is a view into the mapped file, and a ProcessSpec is only built when it is read
+"""
+class BinaryTraceReader():
+    """
+    BinaryTraceReader constructor: map the specified trace file into memory
+    @param fileName: the name of the binary trace file
+    """
+    def __init__(self, fileName):
+        try:
+            with open(fileName, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        #mmap raises ValueError for an empty file
+        except (IOError, ValueError) as e:
+            raise InputFormatError("cannot map {0}: {1}".format(fileName, e))
+        if (len(self.map) < HEADER.size):
+            raise InputFormatError("{0} is too short to be a binary trace".format(fileName))
+        magic, self.numProcesses, self.numPairs, pidBytes = HEADER.unpack_from(self.map, 0)
+        #make sure the file is exactly as long as its header says, so that a truncated trace is rejected up front
+        if (magic != MAGIC or len(self.map) != HEADER.size + 4*(3*self.numProcesses + 2 + 2*self.numPairs) + pidBytes):
+            raise InputFormatError("{0} is not a complete binary trace".format(fileName))
+        #slice the uint32 columns out of the mapped file, in the order they were written
+        view = memoryview(self.map)
+        pos = HEADER.size
+        columns = []
+        for count in (self.numProcesses, self.numProcesses+1, self.numPairs, self.numPairs, self.numProcesses+1):
+            columns.append(self.castColumn(view[pos:pos+4*count]))
+            pos += 4*count
+        self.memSize, self.pairStart, self.arrival, self.runTime, self.pidStart = columns
+        self.pids = view[pos:pos+pidBytes]
+
+    """
+    interpret a slice of the mapped file as a column of uint32s
+    @param data: the memoryview slice holding the column
+    @returns a sequence of ints (a view into the file on little-endian machines, or a byte-swapped copy otherwise)
+    """
+    def castColumn(self, data):
+        if (sys.byteorder == 'little'):
+            return data.cast('I')
+        column = array('I', data.tobytes())
+        column.byteswap()
+        return column
+
+    """
+    get the number of processes in the trace
+    """
+    def __len__(self):
+        return self.numProcesses
+
+    """
+    build the spec for a single process
+    @param i: the index of the process within the trace
+    @returns a ProcessSpec for the process
+    """
+    def getSpec(self, i):
+        pid = bytes(self.pids[self.pidStart[i]:self.pidStart[i+1]]).decode()
+        first = self.pairStart[i]
+        last = self.pairStart[i+1]
+        return ProcessSpec.fromValues(pid, self.memSize[i], zip(self.arrival[first:last], self.runTime[first:last]))
+
+    """
+    iterate over the processes in the trace, building each spec only as it is reached
+    """
+    def __iter__(self):
+        for i in range(self.numProcesses):
+            yield self.getSpec(i)
+
+"""
+The ColumnWriter class buffers a column of uint32s for a binary trace in a temporary file, so that traces of any size can be converted
+"""
+class ColumnWriter():
+    """
+    ColumnWriter constructor: creates a new, empty column
+    """
+    def __init__(self):
+        self.file = tempfile.TemporaryFile()
+        self.buffer = array('I')
+
+    """
+    add a value to the column
+    @param value: the value to add; must fit in a uint32
+    """
+    def append(self, value):
+        self.buffer.append(value)
+        if (len(self.buffer) >= 1<<16):
+            self.flush()
+
+    """
+    write everything buffered so far to the temporary file
+    """
+    def flush(self):
+        if (sys.byteorder != 'little'):
+            self.buffer.byteswap()
+        self.buffer.tofile(self.file)
+        self.buffer = array('I')
+
+    """
+    copy the whole column to the specified file
+    @param out: the file to copy the column to
+    """
+    def copyTo(self, out):
+        self.flush()
+        self.file.seek(0)
+        for chunk in iter(lambda: self.file.read(1<<20), b''):
+            out.write(chunk)
+        self.file.close()
+
+"""
+convert a sequence of ProcessSpecs (e.g. a text trace) into a binary trace file
+@param specs: an iterable of ProcessSpecs
+@param fileName: the name of the binary trace file to write
+"""
+def writeBinaryTrace(specs, fileName):
+    memSize, pairStart, arrival, runTime, pidStart = (ColumnWriter() for i in range(5))
+    pids = tempfile.TemporaryFile()
+    numProcesses = 0
+    numPairs = 0
+    pidBytes = 0
+    pairStart.append(0)
+    pidStart.append(0)
+    for spec in specs:
+        memSize.append(spec.memSize)
+        for pair in spec.arrivalRunPairs:
+            arrival.append(pair[0])
+            runTime.append(pair[1])
+        numPairs += len(spec.arrivalRunPairs)
+        pairStart.append(numPairs)
+        pid = spec.pid.encode()
+        pids.write(pid)
+        pidBytes += len(pid)
+        pidStart.append(pidBytes)
+        numProcesses += 1
+
+    with open(fileName, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, numProcesses, numPairs, pidBytes))
+        for column in (memSize, pairStart, arrival, runTime, pidStart):
+            column.copyTo(out)
+        #copied in chunks, like the columns, so that the pids of a huge trace are never held in memory all at once
+        pids.seek(0)
+        shutil.copyfileobj(pids, out)
+        pids.close()
+
+"""
+main method: convert a text trace into a binary trace
+"""
+def main():
+    #imported here, since project2 itself reads binary traces through this module
+    from project2 import iterInput, exitError
+    if (len(sys.argv) != 3):
+        exitError("Invalid arguments\nUSAGE: python3 BinaryTrace.py p2-input01.txt p2-input01.bin")
+    try:
+        writeBinaryTrace(iterInput(sys.argv[1]), sys.argv[2])
+    except InputFormatError:
+        exitError("Invalid input file format")
+    except OverflowError:
+        exitError("Input values must fit in 32 bits to be stored in a binary trace")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import bisect
+
+"""
+The BuddyAllocator class hands out power-of-two sized blocks of memory using the binary buddy system
+memory is first divided into the largest aligned power-of-two blocks that fit (a single block when numFrames is a power of two);
+a request is rounded up to a power of two, larger free blocks are split in half until one of the right size exists,
+and freed blocks are merged with their buddy (the other half of the block they were split from) for as long as that buddy is free
+"""
+class BuddyAllocator():
+    """
+    BuddyAllocator constructor: creates a new allocator in which all of memory is free
+    @param numFrames: the number of frames in the memory being managed
+    """
+    def __init__(self, numFrames):
+        self.numFrames = numFrames
+        self.maxOrder = max(0, numFrames.bit_length() - 1)
+        #freeLists[order] is the sorted list of starting locations of the free blocks of 2**order frames
+        self.freeLists = [[] for i in range(self.maxOrder + 1)]
+        #dict of location:order for every top-level block, which has no buddy to merge with
+        self.topBlocks = {}
+        pos = 0
+        for order in range(self.maxOrder, -1, -1):
+            if (numFrames - pos >= 1 << order):
+                self.topBlocks[pos] = order
+                self.freeLists[order].append(pos)
+                pos += 1 << order
+        #dict of location:order for every allocated block
+        self.blocks = {}
+        #running totals of the frames requested and the frames handed out to satisfy those requests
+        self.requestedFrames = 0
+        self.allocatedFrames = 0
+
+    """
+    get the order of the smallest block that can hold the specified number of frames
+    @param size: the number of frames requested
+    @returns the order of the block (the block holds 2**order frames)
+    """
+    def getOrder(self, size):
+        #a zero-frame request still takes the smallest block, of order 0 ((-1).bit_length() would make it order 1)
+        return (max(size, 1) - 1).bit_length()
+
+    """
+    get the size of the allocated block at the specified location
+    @param loc: the location of the block
+    """
+    def getBlockSize(self, loc):
+        return 1 << self.blocks[loc]
+
+    """
+    allocate a block big enough for the specified number of frames, choosing the lowest-addressed block of the smallest order available
+    @param size: the number of frames requested
+    @returns the location of the new block, or None if no free block is big enough
+    """
+    def allocate(self, size):
+        order = self.getOrder(size)
+        splitOrder = order
+        while (splitOrder <= self.maxOrder and not self.freeLists[splitOrder]):
+            splitOrder += 1
+        if (splitOrder > self.maxOrder):
+            return None
+        loc = self.freeLists[splitOrder].pop(0)
+        #split the block in half until it is the requested order, freeing the upper half each time
+        while (splitOrder > order):
+            splitOrder -= 1
+            bisect.insort(self.freeLists[splitOrder], loc + (1 << splitOrder))
+        self.blocks[loc] = order
+        self.requestedFrames += size
+        self.allocatedFrames += 1 << order
+        return loc
+
+    """
+    free the allocated block at the specified location, merging it with its buddy for as long as the buddy is free
+    @param loc: the location of the block
+    @returns the size of the block that was freed
+    """
+    def free(self, loc):
+        order = self.blocks.pop(loc)
+        blockSize = 1 << order
+        while (self.topBlocks.get(loc) != order):
+            buddy = loc ^ (1 << order)
+            freeList = self.freeLists[order]
+            i = bisect.bisect_left(freeList, buddy)
+            if (i == len(freeList) or freeList[i] != buddy):
+                break
+            del freeList[i]
+            loc = min(loc, buddy)
+            order += 1
+        bisect.insort(self.freeLists[order], loc)
+        return blockSize
+
+    """
+    get the fraction of all frames handed out so far that went unused because requests were rounded up to a power of two
+    """
+    def getInternalFragmentation(self):
+        return 1 - self.requestedFrames / self.allocatedFrames if self.allocatedFrames > 0 else 0.0
@@ -0,0 +1,167 @@
+import os
+import pickle
+import struct
+import zlib
+from MemoryStore import CHECKPOINT_CHUNK_BITS
+
+"""
+checkpoint files hold a log of records, each a RECORD header (the record's kind and length) followed by a zlib-compressed pickle:
+    header:     MAGIC
+    base:       kind b'B': (context, characters of output written, pickled Simulator, every frame of memory, every row of metrics)
+    delta:      kind b'D': (characters of output written, pickled Simulator, [(first frame, frames)] for each chunk of memory changed since
+                the previous record, the rows of metrics added since the previous record)
+    end:        kind b'E': (characters of output written), once the run is complete
+the Simulator is pickled without its frames (see MemoryStore.__getstate__) or its rows of metrics (see Metrics.__getstate__), so that a
+delta costs only the chunks of memory that changed and the rows that were added, plus the rest of the state, which grows with the number of
+processes in flight rather than the size of memory or the length of the run
+"""
+MAGIC = b'P2CKPT1\n'
+RECORD = struct.Struct('<cI')
+
+#number of deltas written after a base before the log may be replaced by a new base, so that resuming never replays too many records
+#(the log is only replaced once its deltas are at least as large as its base, so that a base holding a long run's metrics is rewritten
+#less and less often, keeping the total cost of checkpointing in proportion to the length of the run)
+DELTAS_PER_BASE = 32
+
+"""
+The Checkpointer class periodically saves the state of a running Simulator, so that the run can be resumed (see loadCheckpoint) if it dies
+the first checkpoint of a run replaces the file with a base snapshot, and later ones append deltas to it
+"""
+class Checkpointer():
+    """
+    Checkpointer constructor: creates a new checkpointer writing to the specified file
+    @param fileName: the name of the checkpoint file
+    @param interval: the number of events to process between checkpoints
+    @param context: a dict of simple values saved with every base, describing where the run fits in (returned by loadCheckpoint)
+    """
+    def __init__(self, fileName, interval=10000, context=None):
+        self.fileName = fileName
+        self.interval = interval
+        self.context = context if context != None else {}
+        self.file = None
+        #number of deltas written since the last base (None until the first base is written), and the compressed sizes of the base and deltas
+        self.deltaCount = None
+        self.baseBytes = 0
+        self.deltaBytes = 0
+        self.lastEventCount = 0
+
+    """
+    save a checkpoint if at least interval events have been processed since the last one
+    @param sim: the Simulator to save
+    """
+    def maybeSave(self, sim):
+        if (sim.eventCount - self.lastEventCount >= self.interval):
+            self.save(sim)
+
+    """
+    append a record to the checkpoint file, making sure it is on disk before we carry on
+    @param kind: the kind of record (b'B', b'D' or b'E')
+    @param payload: the record's contents
+    @returns the number of bytes written
+    """
+    def writeRecord(self, kind, payload):
+        data = zlib.compress(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL))
+        self.file.write(RECORD.pack(kind, len(data)))
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return RECORD.size + len(data)
+
+    """
+    save the current state of a Simulator, as a base if one is due and as a delta otherwise
+    @param sim: the Simulator to save; it must be between events
+    """
+    def save(self, sim):
+        #everything written so far belongs before this checkpoint, so that a resumed run carries on exactly where the output left off
+        sim.out.flush()
+        memStore = sim.memStore
+        isBase = (self.deltaCount == None or (self.deltaCount >= DELTAS_PER_BASE and self.deltaBytes >= self.baseBytes) or
+                  memStore.dirtyChunks == None)
+        #the rows of metrics are taken before pickling, so that the pickled metrics know which rows this record holds
+        rows = sim.metrics.takeRows(isBase) if sim.metrics != None else None
+        state = pickle.dumps(sim, pickle.HIGHEST_PROTOCOL)
+        if (isBase):
+            #write the new base to a temporary file and move it into place, so that a crash never leaves us without a usable checkpoint
+            if (self.file != None):
+                self.file.close()
+            self.file = open(self.fileName + ".tmp", 'wb')
+            self.file.write(MAGIC)
+            self.baseBytes = self.writeRecord(b'B', (self.context, sim.out.charsWritten, state, bytes(memStore.frames), rows))
+            self.file.close()
+            os.replace(self.fileName + ".tmp", self.fileName)
+            self.file = open(self.fileName, 'ab')
+            self.deltaCount = 0
+            self.deltaBytes = 0
+        else:
+            chunkSize = 1 << CHECKPOINT_CHUNK_BITS
+            ranges = [(chunk*chunkSize, bytes(memStore.frames[chunk*chunkSize:(chunk+1)*chunkSize])) for chunk in sorted(memStore.dirtyChunks)]
+            self.deltaBytes += self.writeRecord(b'D', (sim.out.charsWritten, state, ranges, rows))
+            self.deltaCount += 1
+        memStore.dirtyChunks = set()
+        self.lastEventCount = sim.eventCount
+
+    """
+    record that the run is complete, so that resuming from this file moves straight on to whatever comes after the run
+    @param sim: the Simulator that has finished
+    """
+    def finish(self, sim):
+        if (self.file == None):
+            #the run finished before its first checkpoint, so start the file with a base of the finished run
+            self.save(sim)
+        self.writeRecord(b'E', sim.out.charsWritten)
+        self.file.close()
+        self.file = None
+        sim.memStore.dirtyChunks = None
+
+"""
+load the latest checkpoint from a checkpoint file, replaying its deltas onto its base
+a record cut short by a crash (the last one in the file) is ignored, along with anything after it
+@param fileName: the name of the checkpoint file
+@returns a (context, characters of output written, Simulator) tuple; the Simulator is None if the run was complete, and otherwise must have
+         its specs, out and checkpointer set before calling its resume method (raises IOError, or ValueError if the file is not a checkpoint)
+"""
+def loadCheckpoint(fileName):
+    with open(fileName, 'rb') as f:
+        data = f.read()
+    if (not data.startswith(MAGIC)):
+        raise ValueError("{0} is not a checkpoint file".format(fileName))
+
+    context = None
+    state = None
+    frames = None
+    #the rows of metrics held by each record since the base, in order
+    rows = []
+    pos = len(MAGIC)
+    while (pos + RECORD.size <= len(data)):
+        kind, length = RECORD.unpack_from(data, pos)
+        pos += RECORD.size
+        if (pos + length > len(data)):
+            break
+        try:
+            payload = pickle.loads(zlib.decompress(data[pos:pos+length]))
+        except zlib.error:
+            break
+        pos += length
+        if (kind == b'B'):
+            context, outputChars, state, frames, baseRows = payload
+            frames = bytearray(frames)
+            rows = [baseRows]
+        elif (kind == b'D'):
+            outputChars, state, ranges, deltaRows = payload
+            for start, chunk in ranges:
+                frames[start:start+len(chunk)] = chunk
+            rows.append(deltaRows)
+        elif (kind == b'E'):
+            outputChars = payload
+            state = None
+    if (context == None):
+        raise ValueError("{0} does not contain a complete checkpoint".format(fileName))
+
+    if (state == None):
+        return (context, outputChars, None)
+    sim = pickle.loads(state)
+    sim.memStore.frames[:] = frames
+    if (sim.metrics != None):
+        for recordRows in rows:
+            sim.metrics.appendRows(recordRows)
+    return (context, outputChars, sim)
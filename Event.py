@@ -1,4 +1,5 @@
 from enum import Enum
+import heapq
 """
 EventType is a simple enum containing each of the potential EventTypes that may occur in our simulation
 """ 
@@ -33,4 +34,49 @@ class Event():
         if (self.eType != other.eType):
             return self.eType.value < other.eType.value
         #when events are the same, we compare PID
-        return self.process.pid < other.process.pid
\ No newline at end of file
+        return self.process.pid < other.process.pid
+
+"""
+the EventQueue class is a lock-free priority queue of events, ordered the same way as Event.__lt__
+each entry is stored alongside a precomputed tuple sort key, so heap operations compare plain tuples instead of calling back into Python
+"""
+class EventQueue():
+    """
+    EventQueue constructor: create a new, empty event queue
+    """
+    def __init__(self):
+        self.heap = []
+        #insertion counter used as a final tie-breaker, so that entries with identical keys never fall through to comparing Events
+        self.count = 0
+
+    """
+    add an event to the queue
+    @param event: the event to add
+    """
+    def put(self, event):
+        heapq.heappush(self.heap, (event.time, event.eType.value, event.process.pid, self.count, event))
+        self.count += 1
+
+    """
+    remove and return the earliest event in the queue
+    """
+    def get(self):
+        return heapq.heappop(self.heap)[-1]
+
+    """
+    return the earliest event in the queue without removing it
+    """
+    def peek(self):
+        return self.heap[0][-1]
+
+    """
+    return whether or not the queue contains no events
+    """
+    def empty(self):
+        return not self.heap
+
+    """
+    return the number of events currently in the queue
+    """
+    def __len__(self):
+        return len(self.heap)
\ No newline at end of file
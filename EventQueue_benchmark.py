@@ -0,0 +1,74 @@
+import queue
+import random
+import sys
+import time
+from Event import Event, EventType, EventQueue
+from Process import Process
+
+"""
+build a list of random events, with times drawn from a narrow range so that plenty of ties must be broken by type and pid
+@param numEvents: the number of events to generate
+@param seed: the seed for the random number generator, so that every queue sees the same events
+@returns a list of events
+"""
+def makeEvents(numEvents, seed=0):
+    rng = random.Random(seed)
+    processes = [Process(chr(ord('A')+i),"1",["0/1"]) for i in range(26)]
+    return [Event(rng.choice((EventType.SwitchIn, EventType.SwitchOut)), rng.randint(0, numEvents//4), rng.choice(processes))
+            for i in range(numEvents)]
+
+"""
+time a queue using the 'hold' pattern of a discrete event simulator: fill the queue, then repeatedly pop one event and push one
+@param q: the (empty) queue to benchmark; must support put, get and empty
+@param events: the events to push through the queue
+@returns the number of events processed per second
+"""
+def benchmarkQueue(q, events):
+    half = len(events)//2
+    start = time.perf_counter()
+    for ev in events[:half]:
+        q.put(ev)
+    for ev in events[half:]:
+        q.get()
+        q.put(ev)
+    while (not q.empty()):
+        q.get()
+    elapsed = time.perf_counter() - start
+    return len(events) / elapsed
+
+"""
+check that both queues hand back the same events in the same order
+@param events: the events to push through both queues
+@returns whether the orderings matched (true) or not (false)
+"""
+def sameOrdering(events):
+    oldQueue = queue.PriorityQueue()
+    newQueue = EventQueue()
+    for ev in events:
+        oldQueue.put(ev)
+        newQueue.put(ev)
+    while (not oldQueue.empty()):
+        a = oldQueue.get()
+        b = newQueue.get()
+        #events that compare equal may come out in either order, so compare sort keys rather than identity
+        if ((a.time, a.eType.value, a.process.pid) != (b.time, b.eType.value, b.process.pid)):
+            return False
+    return newQueue.empty()
+
+"""
+main method: benchmark queue.PriorityQueue against EventQueue and print the throughput of each
+"""
+def main():
+    numEvents = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    events = makeEvents(numEvents)
+    if (not sameOrdering(events)):
+        print("Error: EventQueue ordering does not match queue.PriorityQueue", file=sys.stderr)
+        sys.exit(1)
+    oldRate = benchmarkQueue(queue.PriorityQueue(), events)
+    newRate = benchmarkQueue(EventQueue(), events)
+    print("queue.PriorityQueue: {0:,.0f} events/sec".format(oldRate))
+    print("EventQueue:          {0:,.0f} events/sec".format(newRate))
+    print("speedup:             {0:.2f}x".format(newRate / oldRate))
+
+if __name__ == "__main__":
+    main()
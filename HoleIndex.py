@@ -0,0 +1,195 @@
+import bisect
+import itertools
+
+"""
+The HoleIndex class keeps track of the free blocks (holes) in a MemoryStore, so that placement never has to rescan memory
+holes are stored as a list of [start, length] extents sorted by start, with adjacent holes always coalesced into one
+the same holes are also kept as (length, start) pairs sorted by size, so that best-fit lookups are a single binary search
+"""
+class HoleIndex():
+    """
+    HoleIndex constructor: creates a new index containing a single hole spanning the entire store
+    @param numFrames: the number of frames in the store we are indexing
+    """
+    def __init__(self, numFrames):
+        self.numFrames = numFrames
+        self.reset([[0, numFrames]] if numFrames > 0 else [])
+
+    """
+    replace the contents of the index with the specified holes
+    @param holes: a list of [start, length] extents, sorted by start and with no two extents adjacent
+    """
+    def reset(self, holes):
+        self.holes = holes
+        self.holesBySize = sorted((hole[1], hole[0]) for hole in holes)
+        self.freeFrames = sum(hole[1] for hole in holes)
+
+    """
+    rebuild the index from scratch by scanning a memory string
+    @param memory: the memory string to scan, where '.' marks a free frame
+    """
+    def rebuild(self, memory):
+        holes = []
+        pos = memory.find('.')
+        while (pos != -1):
+            #find the end of this block of free memory, then resume searching after it
+            end = pos
+            while (end < len(memory) and memory[end] == '.'):
+                end += 1
+            holes.append([pos, end-pos])
+            pos = memory.find('.', end)
+        self.reset(holes)
+
+    """
+    get a copy of the list of holes, so that callers may not accidentally corrupt the index
+    """
+    def getHoles(self):
+        return [list(hole) for hole in self.holes]
+
+    """
+    get the number of holes
+    """
+    def getHoleCount(self):
+        return len(self.holes)
+
+    """
+    get the size of the largest hole, or 0 if there are no holes
+    """
+    def getLargestHole(self):
+        return self.holesBySize[-1][0] if self.holesBySize else 0
+
+    """
+    find the index of the hole containing the specified frame
+    @param loc: the frame to look up
+    @returns the position of the containing hole within self.holes, or -1 if the frame is not free
+    """
+    def findHole(self, loc):
+        #[loc, numFrames+1] sorts after every hole starting at or before loc
+        i = bisect.bisect_right(self.holes, [loc, self.numFrames+1]) - 1
+        if (i >= 0 and self.holes[i][0] + self.holes[i][1] > loc):
+            return i
+        return -1
+
+    """
+    find the smallest hole that can contain a block of the specified size, preferring the lowest address on ties
+    @param size: the number of frames required
+    @returns the start of the chosen hole, or None if no hole is large enough
+    """
+    def findBestFit(self, size):
+        #(size, -1) sorts before every hole of exactly that size, so we land on the lowest-addressed of the smallest valid holes
+        i = bisect.bisect_left(self.holesBySize, (size, -1))
+        if (i == len(self.holesBySize)):
+            return None
+        return self.holesBySize[i][1]
+
+    """
+    find where next-fit would place a block of the specified size: the first position at or after the rover with enough free frames after it,
+    or failing that, the start of the first big enough hole that begins before the rover
+    @param size: the number of frames required
+    @param rover: the frame at which the search starts (the end of the last block placed)
+    @returns the chosen location, or None if no hole is large enough
+    """
+    def findNextFit(self, size, rover):
+        #the hole containing the rover can take the block right at the rover, if enough of it remains
+        i = self.findHole(rover)
+        if (i != -1 and self.holes[i][0] + self.holes[i][1] - rover >= size):
+            return rover
+        #otherwise jump from hole to hole through the rest of memory, then wrap around to the holes before the rover
+        after = bisect.bisect_right(self.holes, [rover, self.numFrames+1])
+        for hole in itertools.chain(itertools.islice(self.holes, after, None), itertools.islice(self.holes, 0, after)):
+            if (hole[1] >= size):
+                return hole[0]
+        return None
+
+    """
+    add a hole to the size-ordered list
+    @param start: the first frame of the hole
+    @param length: the number of frames in the hole
+    """
+    def addSized(self, start, length):
+        bisect.insort(self.holesBySize, (length, start))
+
+    """
+    remove a hole from the size-ordered list
+    @param start: the first frame of the hole
+    @param length: the number of frames in the hole
+    """
+    def removeSized(self, start, length):
+        del self.holesBySize[bisect.bisect_left(self.holesBySize, (length, start))]
+
+    """
+    mark the specified block as allocated, splitting the hole that contains it
+    @param loc: the first frame of the block
+    @param size: the number of frames in the block; the whole block must currently be free
+    """
+    def allocate(self, loc, size):
+        if (size == 0):
+            return
+        i = self.findHole(loc)
+        start, length = self.holes[i]
+        end = start + length
+        #keep whatever remains of the hole on either side of the newly allocated block
+        remaining = []
+        if (loc > start):
+            remaining.append([start, loc-start])
+        if (loc+size < end):
+            remaining.append([loc+size, end-(loc+size)])
+        self.holes[i:i+1] = remaining
+        self.removeSized(start, length)
+        for hole in remaining:
+            self.addSized(hole[0], hole[1])
+        self.freeFrames -= size
+
+    """
+    allocate the lowest-numbered free frames, wherever they may be (used for non-contiguous placement)
+    @param count: the number of frames to allocate; must not exceed freeFrames
+    @returns a list of (start, length) runs of frames that were allocated, in increasing order of address
+    """
+    def allocateLowest(self, count):
+        runs = []
+        remaining = count
+        i = 0
+        #consume holes from the front of the index until we have enough frames
+        while (remaining > 0):
+            start, length = self.holes[i]
+            self.removeSized(start, length)
+            if (length <= remaining):
+                runs.append((start, length))
+                remaining -= length
+                i += 1
+            else:
+                #only part of this hole is needed; the rest of it stays free
+                runs.append((start, remaining))
+                self.holes[i] = [start+remaining, length-remaining]
+                self.addSized(start+remaining, length-remaining)
+                remaining = 0
+        del self.holes[:i]
+        self.freeFrames -= count
+        return runs
+
+    """
+    mark the specified block as free, coalescing it with any neighbouring holes
+    @param loc: the first frame of the block
+    @param size: the number of frames in the block; the whole block must currently be allocated
+    """
+    def free(self, loc, size):
+        if (size == 0):
+            return
+        i = bisect.bisect_left(self.holes, [loc])
+        start = loc
+        end = loc + size
+        first = i
+        last = i
+        #merge with the preceding hole if it ends exactly where we begin
+        if (i > 0 and self.holes[i-1][0] + self.holes[i-1][1] == loc):
+            first = i-1
+            start = self.holes[i-1][0]
+            self.removeSized(self.holes[i-1][0], self.holes[i-1][1])
+        #merge with the following hole if it begins exactly where we end
+        if (i < len(self.holes) and self.holes[i][0] == end):
+            last = i+1
+            end = self.holes[i][0] + self.holes[i][1]
+            self.removeSized(self.holes[i][0], self.holes[i][1])
+        self.holes[first:last] = [[start, end-start]]
+        self.addSized(start, end-start)
+        self.freeFrames += size
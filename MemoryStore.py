@@ -1,8 +1,22 @@
 from Process import Process
 from enum import Enum
 from Event import Event, EventType
+from HoleIndex import HoleIndex
+from PageTable import PageTable
+from BuddyAllocator import BuddyAllocator
 import bisect
-import Simulator
+import heapq
+import itertools
+import time
+
+#byte value stored in each free frame of a MemoryStore
+FREE = ord('.')
+
+#number of the cheapest candidate regions that partial compaction tries to clear before falling back to a full defragmentation
+PARTIAL_COMPACTION_TRIES = 4
+
+#log2 of the number of frames in each chunk of memory that an incremental checkpoint saves (or skips) as a whole
+CHECKPOINT_CHUNK_BITS = 12
 
 """
 State is a simple enum containing each of the potential process states
@@ -11,6 +25,17 @@ class MemoryAlgorithm(Enum):
     nextFit = 1
     firstFit = 2
     bestFit = 3
+    buddy = 4
+    segregatedFit = 5
+
+"""
+CompactionPolicy is a simple enum containing the ways we may make room for a process when no hole is large enough
+"""
+class CompactionPolicy(Enum):
+    #slide every process to the bottom of memory
+    full = 1
+    #move only the processes in the cheapest region that can be cleared, relocating them into other holes (falling back to full)
+    partial = 2
 
 """
 The MemoryStore class represents an array of memory slots with a set number of frames
@@ -20,74 +45,181 @@ class MemoryStore():
     MemoryStore contructor: creates a new memory store with the desired number of frames
     @param numFrames: the fixed number of frames that can be stored here
     @param framesPerLine: optional arg specifying how many frames of memory to output per-line (has no effect on internal repr)
+    @param t_memmove: optional arg specifying the time (in milliseconds) it takes to move one frame of memory during defragmentation
+    @param holeIndex: optional arg specifying the index of free blocks to use (defaults to a new HoleIndex; a SegregatedFitIndex is needed by
+                      addProcessSegregated)
+    @param compaction: optional arg specifying the CompactionPolicy used when a contiguous process does not fit in any hole
     """
-    def __init__(self, numFrames=256, framesPerLine=32):
+    def __init__(self, numFrames=256, framesPerLine=32, t_memmove=1, holeIndex=None, compaction=CompactionPolicy.full):
         self.numFrames = numFrames
         self.framesPerLine = framesPerLine
-        self.memory = '.'*numFrames
+        #memory is stored one byte per frame, so that placement and removal can overwrite frames in place
+        self.frames = bytearray(b'.'*numFrames)
+        #read-only run of free frames, sliced (without copying) whenever we need to clear a block of memory
+        self.blankFrames = memoryview(b'.'*numFrames)
+        
+        #index of free blocks, kept up to date on every placement and removal so that we never need to rescan memory
+        self.holeIndex = holeIndex if holeIndex != None else HoleIndex(numFrames)
+        
+        #power-of-two blocks handed out by the buddy algorithm (only used when placing with addProcessBuddy)
+        self.buddy = BuddyAllocator(numFrames)
         
         #store a list of processes currently in the memory store (sorted in order of smallest to greatest memLocation)
         self.processes = []
         
         self.lastPlacedLoc = 0
         
-        self.t_memmove = 1
+        self.t_memmove = t_memmove
+        self.compaction = compaction
+        
+        #the Simulator that owns this store (if any), whose clock we read and push back, and through which we report defragmentation
+        self.sim = None
+        
+        #page to frame mapping of every non-contiguous process, stored as runs of consecutive frames
+        self.pageTable = PageTable()
         
-        #dict of pid:[(pageNum,frameNum)]
-        self.pageTable = {}
+        #running totals reported at the end of a run
+        self.defragCount = 0
+        self.framesMoved = 0
         
+        #cache of the rendered lines of memory, so that printing only re-renders the lines that changed since the last print
+        #(not built until we are first printed, so that stores which are never printed don't pay for it)
+        self.renderedLines = None
+        self.dirtyLines = set()
+        self.rendered = None
+        
+        #chunks of memory changed since the last checkpoint (None unless a Checkpointer is tracking us)
+        self.dirtyChunks = None
+        #number of changes made to memory so far, so that a caller can tell whether memory changed between two points
+        self.changeCount = 0
+        
+    """
+    get the state to save when this store is pickled for a checkpoint
+    the frames are left out, since a Checkpointer saves them itself (only the chunks that changed, when it can), as are the render caches
+    """
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('frames', 'blankFrames', 'renderedLines', 'dirtyLines', 'rendered', 'dirtyChunks'):
+            del state[name]
+        return state
+    
+    """
+    restore this store from a checkpoint, with every frame free until the Checkpointer fills in the saved frames
+    @param state: the state saved by __getstate__
+    """
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.frames = bytearray(b'.'*self.numFrames)
+        self.blankFrames = memoryview(b'.'*self.numFrames)
+        self.renderedLines = None
+        self.dirtyLines = set()
+        self.rendered = None
+        self.dirtyChunks = None
+        
+    """
+    the contents of memory as a string, with one character per frame ('.' for a free frame)
+    """
+    @property
+    def memory(self):
+        return self.frames.decode()
+    
+    """
+    overwrite the contents of memory directly, rebuilding the hole index to match
+    @param value: the new memory string; must contain exactly numFrames characters
+    """
+    @memory.setter
+    def memory(self, value):
+        self.frames[:] = value.encode()
+        self.holeIndex.rebuild(value)
+        self.markDirty(0,self.numFrames)
+    
+    """
+    record that the specified block of memory has changed, so that its lines are re-rendered the next time we are printed
+    (and its chunks are saved by the next checkpoint)
+    @param loc: the first frame of the block
+    @param size: the number of frames in the block
+    """
+    def markDirty(self, loc, size):
+        if (size > 0):
+            self.changeCount += 1
+        if (size > 0 and self.renderedLines != None):
+            self.dirtyLines.update(range(loc//self.framesPerLine, (loc+size-1)//self.framesPerLine + 1))
+            self.rendered = None
+        if (size > 0 and self.dirtyChunks != None):
+            self.dirtyChunks.update(range(loc >> CHECKPOINT_CHUNK_BITS, ((loc+size-1) >> CHECKPOINT_CHUNK_BITS) + 1))
+    
+    """
+    fill the specified block of memory with a process' pid
+    @param loc: the first frame of the block
+    @param size: the number of frames in the block
+    @param pid: the pid whose first character is stored in each frame
+    """
+    def fillFrames(self, loc, size, pid):
+        self.frames[loc:loc+size] = pid[0].encode()*size
+        self.markDirty(loc,size)
+    
+    """
+    mark the specified block of memory as free
+    @param loc: the first frame of the block
+    @param size: the number of frames in the block
+    """
+    def clearFrames(self, loc, size):
+        self.frames[loc:loc+size] = self.blankFrames[:size]
+        self.markDirty(loc,size)
+    
     """
     get the amount of free memory currently available in the store
     """
     def getFreeMemory(self):
-        return self.memory.count('.')
+        return self.holeIndex.freeFrames
     
     """
     get a list containing the location and size of each free block of memory
     """
     def getFreeMemoryLocations(self):
-        memLocs = []
-        inMemBlock = False
-        memStartPos = -1
-        #iterate over the memory store to find the beginning of each block of memory
-        for i in range(len(self.memory)):
-            if (self.memory[i] == '.'):
-                if (not inMemBlock):
-                    inMemBlock = True
-                    memStartPos = i
-            else:
-                if (inMemBlock):
-                    inMemBlock = False
-                    memLocs.append([memStartPos,(i-memStartPos)])
-        #if we were still reading free memory when we reached the end of the store, add the remaining memory to the list of locations
-        if (inMemBlock):
-            memLocs.append([memStartPos,(i+1-memStartPos)])
-        return memLocs
+        return self.holeIndex.getHoles()
+    
+    """
+    get the size of the largest free block of memory
+    """
+    def getLargestFreeBlock(self):
+        return self.holeIndex.getLargestHole()
+    
+    """
+    get the fraction of allocated memory lost to internal fragmentation (non-zero only for the buddy algorithm, which rounds sizes up)
+    """
+    def getInternalFragmentation(self):
+        return self.buddy.getInternalFragmentation()
+    
+    """
+    get the number of separate free blocks of memory
+    """
+    def getFreeBlockCount(self):
+        return self.holeIndex.getHoleCount()
         
     """
     return a string representing this store's memory, split into lines as specified by framesPerLine
     """
     def __str__(self):
-        border = '='*self.framesPerLine
-        return border + '\n' + '\n'.join([self.memory[i:i+self.framesPerLine] for i in range(0, self.numFrames, self.framesPerLine)]) + '\n' + border
+        if (self.renderedLines == None):
+            numLines = (self.numFrames + self.framesPerLine - 1) // self.framesPerLine
+            self.renderedLines = ['']*numLines
+            self.dirtyLines = set(range(numLines))
+        if (self.rendered == None):
+            #re-render only the lines that have changed since we were last printed
+            for line in self.dirtyLines:
+                start = line*self.framesPerLine
+                self.renderedLines[line] = self.frames[start:start+self.framesPerLine].decode()
+            self.dirtyLines.clear()
+            border = '='*self.framesPerLine
+            self.rendered = border + '\n' + '\n'.join(self.renderedLines) + '\n' + border
+        return self.rendered
     
     """
-    print the current state of the page table
-    """
-    def displayPageTable(self):
-        print("PAGE TABLE [page,frame]:")
-        #print out the page table ordered by pid
-        keys = list(self.pageTable.keys())
-        keys.sort()
-        for key in keys:
-            print("{0}: ".format(key),end='')
-            #print out all entries corresponding to this key, with a newline after every 10th entry
-            vals = self.pageTable[key]
-            for i in range(len(vals)):
-                print((' ' if i%10 != 0 else '') + str(vals[i]).replace('(','[').replace(')',']').replace(' ',''),end=('\n' if (i+1)%10 == 0 else ''))
-            #print a newline before moving on to the next value unless we just finished a row
-            if (len(vals) % 10 != 0):
-                print()
+    return a string containing the current state of the page table
+    """
+    def formatPageTable(self):
+        return self.pageTable.format()
                       
     """
     check whether or not a defragmentation will free up enough space to place the desired process
@@ -100,32 +232,123 @@ class MemoryStore():
     defragment our memory, moving processes up to fill all free gaps, and increasing simTime accordingly
     """
     def defragment(self):
-        #keep track of how far we move time forward so we can push back events accordingly
-        prevSimTime = Simulator.simTime
+        startTime = time.perf_counter()
+        #keep track of how many frames we move so we can push back time and events accordingly
+        movedFrames = 0
         affectedProcesses = []
         
         self.lastPlacedLoc = 0
+        #sweep through the processes in order of memLocation, sliding each one down to the end of the previous one
+        writePos = 0
         for proc in self.processes:
-            earliestFree = self.memory.find('.')
-            if (earliestFree < proc.memLocation):
-                #there is free space in our memory before this location's starting value; move it up and increment time accordingly
-                removedMem = self.memory[:proc.memLocation] + self.memory[proc.memLocation+proc.memSize:]
-                reinsertedMem = removedMem[:earliestFree] + proc.pid * proc.memSize + removedMem[earliestFree:]
-                self.memory = reinsertedMem
-                #add t_memmove for each frame of memory in the process
-                Simulator.simTime += self.t_memmove * proc.memSize
+            if (writePos < proc.memLocation):
+                #there is free space in our memory before this location's starting value; move it up
+                self.fillFrames(writePos,proc.memSize,proc.pid)
+                movedFrames += proc.memSize
                 affectedProcesses.append(proc)
-                proc.memLocation = earliestFree
+                proc.memLocation = writePos
+            writePos += proc.memSize
         
-        timeDiff = Simulator.simTime - prevSimTime
+        #all free memory is now a single block at the end of the store
+        self.clearFrames(writePos,self.numFrames-writePos)
+        self.holeIndex.reset([[writePos, self.numFrames-writePos]] if writePos < self.numFrames else [])
         
-        #update all events to compensate for elapsed time during defragmentation
-        for ev in Simulator.events.queue:
-                ev.time += timeDiff
+        self.finishDefragment(startTime,movedFrames,affectedProcesses,"Defragmentation")
+
+    """
+    account for a completed defragmentation or compaction, pushing back simTime and reporting what was moved
+    @param startTime: the wall-clock time (from time.perf_counter) at which the defragmentation started
+    @param movedFrames: the number of frames that were moved
+    @param affectedProcesses: the processes that were moved
+    @param name: the name under which the defragmentation is reported
+    """
+    def finishDefragment(self, startTime, movedFrames, affectedProcesses, name):
+        #add t_memmove for each frame of memory we moved, delaying all pending events by the same amount
+        timeDiff = self.t_memmove * movedFrames
+        self.defragCount += 1
+        self.framesMoved += movedFrames
+        
+        if (self.sim != None):
+            if (self.sim.metrics != None):
+                self.sim.metrics.recordDefrag(time.perf_counter() - startTime, movedFrames)
+            self.sim.shiftTime(timeDiff)
+            self.sim.log("time {0}ms: {1} complete (moved {2} frames: {3})".format(self.sim.simTime,name,movedFrames,
+                                                                         str([p.pid for p in affectedProcesses]).strip('[').strip(']').replace("'","")))
+            self.sim.showMemory()
+
+    """
+    find the cheapest way to open a hole of the specified size by moving processes out of its way into other holes
+    @param memNeeded: the size of the hole we need
+    @returns a list of (process, new location) moves, or None if no region can be cleared this way
+    """
+    def planCompaction(self, memNeeded):
+        procs = self.processes
+        #gap k is the hole (possibly empty) between process k-1 and process k, running from gapStarts[k] to gapEnds[k]
+        gapStarts = [0] + [proc.memLocation + proc.memSize for proc in procs]
+        gapEnds = [proc.memLocation for proc in procs] + [self.numFrames]
+
+        #clearing processes first..last opens a hole from gapStarts[first] to gapEnds[last+1]; for each first process, find the fewest
+        #processes we need to clear (and so the fewest frames we need to move) to open a hole of memNeeded frames
+        candidates = []
+        last = -1
+        cost = 0
+        for first in range(len(procs)):
+            if (last < first):
+                last = first
+                cost = procs[first].memSize
+            while (last+1 < len(procs) and gapEnds[last+1] - gapStarts[first] < memNeeded):
+                last += 1
+                cost += procs[last].memSize
+            if (gapEnds[last+1] - gapStarts[first] < memNeeded):
+                break
+            candidates.append((cost, first, last))
+            cost -= procs[first].memSize
+
+        #try the cheapest regions, until the processes in one of them can all be moved into holes outside of it
+        totalFree = self.getFreeMemory()
+        for cost, first, last in heapq.nsmallest(PARTIAL_COMPACTION_TRIES, candidates):
+            insideFree = gapEnds[last+1] - gapStarts[first] - cost
+            if (cost > totalFree - insideFree):
+                continue
+            holes = [[gapStarts[k], gapEnds[k]-gapStarts[k]] for k in itertools.chain(range(first), range(last+2, len(gapStarts)))
+                     if gapEnds[k] > gapStarts[k]]
+            moves = []
+            #place the largest processes first, each into the smallest outside hole that still fits it
+            for proc in sorted(procs[first:last+1], key=lambda proc: -proc.memSize):
+                hole = min((hole for hole in holes if hole[1] >= proc.memSize), key=lambda hole: (hole[1], hole[0]), default=None)
+                if (hole == None):
+                    break
+                moves.append((proc, hole[0]))
+                hole[0] += proc.memSize
+                hole[1] -= proc.memSize
+            else:
+                return moves
+        return None
+
+    """
+    open a hole of the specified size by moving as few frames as we can, increasing simTime accordingly
+    @param memNeeded: the size of the hole we need
+    @returns whether a hole was opened (true) or no region could be cleared without a full defragmentation (false)
+    """
+    def compact(self, memNeeded):
+        startTime = time.perf_counter()
+        moves = self.planCompaction(memNeeded)
+        if (moves == None):
+            return False
+        #claim every destination before releasing any source, so that each destination is still the start of a hole when we claim it
+        for proc, loc in moves:
+            self.fillFrames(loc,proc.memSize,proc.pid)
+            self.holeIndex.allocate(loc,proc.memSize)
+        for proc, loc in moves:
+            self.clearFrames(proc.memLocation,proc.memSize)
+            self.holeIndex.free(proc.memLocation,proc.memSize)
+            proc.memLocation = loc
+        self.processes.sort()
         
-        print("time {0}ms: Defragmentation complete (moved {1} frames: {2})".format(Simulator.simTime,timeDiff,
-                                                                                    str([p.pid for p in affectedProcesses]).strip('[').strip(']').replace("'","")))
-        print(self)
+        #report the moved processes in order of their new location, as a full defragmentation does
+        affectedProcesses = sorted((proc for proc, loc in moves), key=lambda proc: proc.memLocation)
+        self.finishDefragment(startTime,sum(proc.memSize for proc in affectedProcesses),affectedProcesses,"Partial defragmentation")
+        return True
 
     """
     insert the specified process into our processes list sorted by memLocation
@@ -138,14 +361,19 @@ class MemoryStore():
     """
     def removeProcess(self,process):
         if (process.pid in self.pageTable):
-            self.pageTable.pop(process.pid)
-            #iterate over memory, removing all references to the process
-            for i in range(len(self.memory)):
-                if (self.memory[i] == process.pid):
-                    self.memory = self.memory[:i] + '.' + self.memory[i+1:]
+            #free exactly the frames listed in the page table, one run of consecutive frames at a time
+            for runStart, runLength in self.pageTable.remove(process.pid):
+                self.clearFrames(runStart,runLength)
+                self.holeIndex.free(runStart,runLength)
+        elif (process.memLocation in self.buddy.blocks):
+            #release the whole buddy block, not just the frames the process used
+            blockSize = self.buddy.free(process.memLocation)
+            self.clearFrames(process.memLocation,process.memSize)
+            self.holeIndex.free(process.memLocation,blockSize)
         else:
             #remove the process from memory
-            self.memory = self.memory[:process.memLocation] + '.'*process.memSize + self.memory[process.memLocation+process.memSize:]
+            self.clearFrames(process.memLocation,process.memSize)
+            self.holeIndex.free(process.memLocation,process.memSize)
                 
         #remove the process from our processes list
         self.processes.remove(process)
@@ -158,8 +386,9 @@ class MemoryStore():
     """
     def addProcessAtLocation(self,proc,loc):
         proc.memLocation = loc
-        self.memory = self.memory[:loc] + proc.pid*proc.memSize + self.memory[loc+proc.memSize:]
-        proc.memEnterTime = Simulator.simTime
+        self.fillFrames(loc,proc.memSize,proc.pid)
+        self.holeIndex.allocate(loc,proc.memSize)
+        proc.memEnterTime = self.sim.simTime if self.sim != None else 0
         self.insertProcess(proc)
         self.lastPlacedLoc = loc + proc.memSize
         return True
@@ -174,8 +403,10 @@ class MemoryStore():
     def checkFirstRun(self,firstRun, func, proc):
         if (firstRun):
             if (self.defragmentWillWork(proc.memSize)):
-                print("time {0}ms: Cannot place process {1} -- starting defragmentation".format(Simulator.simTime,proc.pid))
-                self.defragment()
+                if (self.sim != None):
+                    self.sim.log("time {0}ms: Cannot place process {1} -- starting defragmentation".format(self.sim.simTime,proc.pid))
+                if (not (self.compaction == CompactionPolicy.partial and self.compact(proc.memSize))):
+                    self.defragment()
                 return func(proc,False)
         #we already defragmented and still didn't find a location, so nothing we can do
         return False
@@ -190,22 +421,13 @@ class MemoryStore():
         if (not self.defragmentWillWork(process.memSize)):
             return False
         
-        #begin building up a list of pid memory locations, to be added to our pageTable at the end
-        newPages = []
-        pagesAdded = 0
-        for i in range(len(self.memory)):
-            if (self.memory[i] == '.'):
-                #this memory slot is free; add the process here
-                self.memory = self.memory[:i] + process.pid + self.memory[i+1:]
-                newPages.append((pagesAdded,i))
-                pagesAdded += 1
-                
-                #stop once we've allocated enough pages
-                if (pagesAdded == process.memSize):
-                    break
+        #take the lowest-numbered free frames from the hole index; pages are assigned to them in order
+        runs = self.holeIndex.allocateLowest(process.memSize)
+        for start, length in runs:
+            self.fillFrames(start,length,process.pid)
         
-        #apply the new pageList to the pageTable and return success  
-        self.pageTable[process.pid] = newPages
+        #apply the new runs to the pageTable and return success  
+        self.pageTable.add(process.pid,runs)
         self.processes.append(process)
         return True
     
@@ -215,33 +437,10 @@ class MemoryStore():
     @param firstRun: whether we are running the process for the first time (true) or immediately after a defragmentation (false)
     """
     def addProcessNext(self,process, firstRun = True):
-        #iterate from lastPlacedLoc to the end of memory, looking for a large enough slot
-        pos = self.lastPlacedLoc
-        while (pos+process.memSize <= len(self.memory)):
-            if (self.memory[pos] == '.'):
-                #this is a valid space and our process will fit; now check that all required slots are free
-                slotsFree = True
-                for i in range(process.memSize):
-                    if (self.memory[pos+i] != '.'):
-                        slotsFree = False
-                        break
-                if (slotsFree):
-                    return self.addProcessAtLocation(process,pos)
-            pos += 1
-        
-        #we didn't find a valid memory location after lastPlacedLoc, so now let's search again from the beginning up to lastPlacedLoc
-        pos = 0
-        while (pos < self.lastPlacedLoc and pos+process.memSize <= len(self.memory)):
-            if (self.memory[pos] == '.'):
-                #this is a valid space and our process will fit; now check that all required slots are free
-                slotsFree = True
-                for i in range(process.memSize):
-                    if (self.memory[pos+i] != '.'):
-                        slotsFree = False
-                        break
-                if (slotsFree):
-                    return self.addProcessAtLocation(process,pos)
-            pos += 1
+        #jump hole to hole from lastPlacedLoc to the end of memory, then wrap around once to the holes before it
+        loc = self.holeIndex.findNextFit(process.memSize,self.lastPlacedLoc)
+        if (loc != None):
+            return self.addProcessAtLocation(process,loc)
         
         #we didn't find a location at which to place the process, so defragment and try again
         return self.checkFirstRun(firstRun,self.addProcessNext,process)         
@@ -252,9 +451,8 @@ class MemoryStore():
     @param firstRun: whether we are running the process for the first time (true) or immediately after a defragmentation (false)
     """
     def addProcessFirst(self,process, firstRun = True):
-        freeLocs = self.getFreeMemoryLocations()
         #check all free memory locations for the first location big enough to contain the new process
-        for loc in freeLocs:
+        for loc in self.holeIndex.holes:
             if (loc[1] >= process.memSize):
                 #we found a location for the process! add it to the processes list
                 return self.addProcessAtLocation(process,loc[0])
@@ -268,19 +466,40 @@ class MemoryStore():
     @param firstRun: whether we are running the process for the first time (true) or immediately after a defragmentation (false)
     """
     def addProcessBest(self,process, firstRun = True):
-        freeLocs = self.getFreeMemoryLocations()
-        #check all free memory locations for the smallest location big enough to contain the new process
-        smallestValidLocSize = None
-        smallestValidLoc = None
-        for loc in freeLocs:
-            if (loc[1] >= process.memSize):
-                if (smallestValidLocSize == None or loc[1] < smallestValidLocSize):
-                    smallestValidLocSize = loc[1]
-                    smallestValidLoc = loc[0]
-                    
+        #look up the smallest free memory location big enough to contain the new process (lowest address on ties)
+        smallestValidLoc = self.holeIndex.findBestFit(process.memSize)
         if (smallestValidLoc != None):
             #we found a location for the process! add it to the processes list
             return self.addProcessAtLocation(process,smallestValidLoc)
             
         #we didn't find a location at which to place the process, so defragment and try again
-        return self.checkFirstRun(firstRun,self.addProcessBest,process)
\ No newline at end of file
+        return self.checkFirstRun(firstRun,self.addProcessBest,process)
+
+    """
+    add a process to the store using the buddy algorithm
+    the process gets a whole power-of-two block; frames of the block beyond memSize stay empty but cannot be used by anyone else
+    @param process: the process to be added
+    @param firstRun: unused; the buddy algorithm never defragments, since moving blocks would break their power-of-two alignment
+    """
+    def addProcessBuddy(self,process, firstRun = True):
+        loc = self.buddy.allocate(process.memSize)
+        if (loc == None):
+            return False
+        self.addProcessAtLocation(process,loc)
+        #reserve the unused tail of the block in the hole index as well, so that free memory reports only what can really be allocated
+        self.holeIndex.allocate(loc+process.memSize,self.buddy.getBlockSize(loc)-process.memSize)
+        return True
+
+    """
+    add a process to the store using the segregated-fit algorithm (requires a SegregatedFitIndex)
+    @param process: the process to be added
+    @param firstRun: whether we are running the process for the first time (true) or immediately after a defragmentation (false)
+    """
+    def addProcessSegregated(self,process, firstRun = True):
+        #take a hole from the first non-empty size-class bin that is big enough (or, once we have defragmented, from the process' own bin)
+        loc = self.holeIndex.findFit(process.memSize, not firstRun)
+        if (loc != None):
+            return self.addProcessAtLocation(process,loc)
+        
+        #we didn't find a location at which to place the process, so defragment and try again
+        return self.checkFirstRun(firstRun,self.addProcessSegregated,process)
@@ -1,4 +1,21 @@
 from MemoryStore import *
+from SegregatedFitIndex import SegregatedFitIndex
+from ArrivalSource import ArrivalSource, ArrivalOrderError
+from Simulator import Simulator
+from ShardedSimulator import ShardedSimulator, RoutingPolicy
+from Checkpoint import Checkpointer, loadCheckpoint
+from Output import OutputLevel, OutputWriter
+from Sweep import Sweep, getCacheKey, hashTrace
+from BinaryTrace import BinaryTraceReader, writeBinaryTrace
+from project2 import readInput
+from TraceGenerator import TraceGenerator
+import BatchSimulator
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
 
 func = ""
 
@@ -94,6 +111,576 @@ new memory locations: [[6, 250]]
     realOutput += "new memory locations: {0}\n".format(testMS.getFreeMemoryLocations())
     return compareOutput(expectedOutput, realOutput)
 
+"""
+test that removing processes coalesces the freed memory with its neighbouring holes
+"""
+def testRemoveProcessCoalesce():
+    expectedOutput = """memory locations after adding A, B, C: [[24, 232]]
+memory locations after removing B: [[8, 8], [24, 232]]
+memory locations after removing A: [[0, 16], [24, 232]]
+memory locations after removing C: [[0, 256]]
+free memory size: 256
+"""
+    realOutput = ""
+    testMS = MemoryStore()
+    procs = [Process(pid,"8",["0/1"]) for pid in "ABC"]
+    for proc in procs:
+        testMS.addProcessFirst(proc)
+    realOutput += "memory locations after adding A, B, C: {0}\n".format(testMS.getFreeMemoryLocations())
+    testMS.removeProcess(procs[1])
+    realOutput += "memory locations after removing B: {0}\n".format(testMS.getFreeMemoryLocations())
+    testMS.removeProcess(procs[0])
+    realOutput += "memory locations after removing A: {0}\n".format(testMS.getFreeMemoryLocations())
+    testMS.removeProcess(procs[2])
+    realOutput += "memory locations after removing C: {0}\n".format(testMS.getFreeMemoryLocations())
+    realOutput += "free memory size: {0}\n".format(testMS.getFreeMemory())
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that best-fit chooses the smallest hole that fits, breaking ties by lowest address
+"""
+def testBestFitTieBreak():
+    expectedOutput = """memory locations before placing E: [[8, 8], [24, 4], [32, 224]]
+E placed at: 24
+memory locations after placing E: [[8, 8], [32, 224]]
+"""
+    realOutput = ""
+    testMS = MemoryStore()
+    testMS.memory = "A"*8 + "."*8 + "B"*8 + "."*4 + "C"*4 + testMS.memory[32:]
+    realOutput += "memory locations before placing E: {0}\n".format(testMS.getFreeMemoryLocations())
+    procE = Process('E',"4",["0/1"])
+    testMS.addProcessBest(procE)
+    realOutput += "E placed at: {0}\n".format(procE.memLocation)
+    realOutput += "memory locations after placing E: {0}\n".format(testMS.getFreeMemoryLocations())
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that printing the store again after a change re-renders only what changed, without serving stale lines
+"""
+def testRenderAfterChange():
+    expectedOutput = """================================
+AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA
+AAAA............................
+................................
+................................
+................................
+................................
+................................
+................................
+================================
+================================
+................................
+................................
+................................
+................................
+................................
+................................
+................................
+................................
+================================"""
+    testMS = MemoryStore()
+    str(testMS)
+    procA = Process('A',"36",["0/1"])
+    testMS.addProcessFirst(procA)
+    realOutput = str(testMS) + '\n'
+    testMS.removeProcess(procA)
+    realOutput += str(testMS)
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that a process larger than all of memory is never placed, even in an empty store
+"""
+def testOversizedProcess():
+    expectedOutput = """next-fit placed E: False
+first-fit placed E: False
+best-fit placed E: False
+processes: []
+memory locations: [[0, 256]]
+frames in memory: 256
+"""
+    realOutput = ""
+    testMS = MemoryStore()
+    procE = Process('E',"300",["0/5"])
+    realOutput += "next-fit placed E: {0}\n".format(testMS.addProcessNext(procE))
+    realOutput += "first-fit placed E: {0}\n".format(testMS.addProcessFirst(procE))
+    realOutput += "best-fit placed E: {0}\n".format(testMS.addProcessBest(procE))
+    realOutput += "processes: {0}\n".format(testMS.processes)
+    realOutput += "memory locations: {0}\n".format(testMS.getFreeMemoryLocations())
+    realOutput += "frames in memory: {0}\n".format(len(testMS.memory))
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that the buddy algorithm rounds sizes up to a power of two, splitting blocks on placement and merging buddies on removal
+"""
+def testBuddySplitCoalesce():
+    expectedOutput = """A placed at: 0
+B placed at: 32
+memory locations after adding A, B: [[48, 208]]
+internal fragmentation: 0.27
+memory locations after removing A: [[0, 32], [48, 208]]
+memory locations after removing B: [[0, 256]]
+free buddy blocks: [[], [], [], [], [], [], [], [], [0]]
+block orders for 0, 1, 2, 3 frames: [0, 0, 1, 2]
+"""
+    realOutput = ""
+    testMS = MemoryStore()
+    procA = Process('A',"20",["0/1"])
+    procB = Process('B',"15",["0/1"])
+    testMS.addProcessBuddy(procA)
+    testMS.addProcessBuddy(procB)
+    realOutput += "A placed at: {0}\nB placed at: {1}\n".format(procA.memLocation,procB.memLocation)
+    realOutput += "memory locations after adding A, B: {0}\n".format(testMS.getFreeMemoryLocations())
+    realOutput += "internal fragmentation: {0:.2f}\n".format(testMS.getInternalFragmentation())
+    testMS.removeProcess(procA)
+    realOutput += "memory locations after removing A: {0}\n".format(testMS.getFreeMemoryLocations())
+    testMS.removeProcess(procB)
+    realOutput += "memory locations after removing B: {0}\n".format(testMS.getFreeMemoryLocations())
+    realOutput += "free buddy blocks: {0}\n".format(testMS.buddy.freeLists)
+    realOutput += "block orders for 0, 1, 2, 3 frames: {0}\n".format([testMS.buddy.getOrder(size) for size in range(4)])
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that segregated-fit takes a hole from a large enough size-class bin, and that removing it restores the hole
+"""
+def testSegregatedFit():
+    expectedOutput = """memory locations before placing E: [[8, 8], [24, 4], [32, 224]]
+E placed at: 24
+memory locations after placing E: [[8, 8], [32, 224]]
+memory locations after removing E: [[8, 8], [24, 4], [32, 224]]
+largest free block: 224
+"""
+    realOutput = ""
+    testMS = MemoryStore(holeIndex=SegregatedFitIndex(256))
+    testMS.memory = "A"*8 + "."*8 + "B"*8 + "."*4 + "C"*4 + testMS.memory[32:]
+    realOutput += "memory locations before placing E: {0}\n".format(testMS.getFreeMemoryLocations())
+    procE = Process('E',"4",["0/1"])
+    testMS.addProcessSegregated(procE)
+    realOutput += "E placed at: {0}\n".format(procE.memLocation)
+    realOutput += "memory locations after placing E: {0}\n".format(testMS.getFreeMemoryLocations())
+    testMS.removeProcess(procE)
+    realOutput += "memory locations after removing E: {0}\n".format(testMS.getFreeMemoryLocations())
+    realOutput += "largest free block: {0}\n".format(testMS.getLargestFreeBlock())
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that segregated-fit rounds a request up to the first bin whose holes are all big enough, passing over a hole in the request's own bin
+until a defragmentation, and that the largest hole is still found as holes come and go
+"""
+def testSegregatedFitRoundUp():
+    expectedOutput = """fit for 65 frames: None
+fit for 65 frames after defragmenting: 70
+fit for 64 frames: 0
+largest hole: 67, then 66 after taking it
+C placed at: 190
+memory locations after placing C: [[255, 1]]
+"""
+    realOutput = ""
+    index = SegregatedFitIndex(256)
+    #holes of 64 and 67 frames share the 64-67 bin, which a 65-frame request rounds up past
+    index.reset([[0, 64], [70, 67], [140, 66]])
+    realOutput += "fit for 65 frames: {0}\n".format(index.findFit(65))
+    realOutput += "fit for 65 frames after defragmenting: {0}\n".format(index.findFit(65, True))
+    realOutput += "fit for 64 frames: {0}\n".format(index.findFit(64))
+    largest = index.getLargestHole()
+    index.allocate(70, 67)
+    realOutput += "largest hole: {0}, then {1} after taking it\n".format(largest, index.getLargestHole())
+    #C does not fit the rounded-up bin, so it is only placed once defragmentation has left one hole of 66 frames, in C's own bin
+    testMS = MemoryStore(holeIndex=SegregatedFitIndex(256))
+    procs = [Process(pid,size,["0/1"]) for pid, size in (('X',"30"),('A',"64"),('Y',"36"),('B',"126"))]
+    for proc in procs:
+        testMS.addProcessSegregated(proc)
+    testMS.removeProcess(procs[0])
+    testMS.removeProcess(procs[2])
+    procC = Process('C',"65",["0/1"])
+    testMS.addProcessSegregated(procC)
+    realOutput += "C placed at: {0}\n".format(procC.memLocation)
+    realOutput += "memory locations after placing C: {0}\n".format(testMS.getFreeMemoryLocations())
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that next-fit moves on from the rover when what is left of its hole is too short, wraps around to holes before the rover when no later
+hole fits, and skips a process larger than all of memory
+"""
+def testNextFitRover():
+    expectedOutput = """memory locations: [[0, 4], [10, 2], [50, 2]]
+D placed at: 50
+E placed at: 0
+F placed: False
+memory locations after placing D, E: [[2, 2], [10, 2]]
+"""
+    realOutput = ""
+    testMS = MemoryStore(numFrames=64)
+    for pid, size, loc in (('A',"6",4),('B',"38",12),('C',"12",52)):
+        testMS.addProcessAtLocation(Process(pid,size,["0/1"]),loc)
+    realOutput += "memory locations: {0}\n".format(testMS.getFreeMemoryLocations())
+    #the rover is inside [10, 2] with only one frame of the hole left, so D must move on to the next hole after it rather than wrapping to [0, 4]
+    testMS.lastPlacedLoc = 11
+    procD = Process('D',"2",["0/1"])
+    testMS.addProcessNext(procD)
+    realOutput += "D placed at: {0}\n".format(procD.memLocation)
+    #no hole after the rover is left, so E wraps around to the first hole that fits
+    procE = Process('E',"2",["0/1"])
+    testMS.addProcessNext(procE)
+    realOutput += "E placed at: {0}\n".format(procE.memLocation)
+    realOutput += "F placed: {0}\n".format(testMS.addProcessNext(Process('F',"100",["0/1"])))
+    realOutput += "memory locations after placing D, E: {0}\n".format(testMS.getFreeMemoryLocations())
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that non-contiguous placement stores each process' pages as runs of frames, and still shows one [page,frame] entry per page
+"""
+def testPageTableExtents():
+    expectedOutput = """runs of C: [(8, 4), (16, 8)]
+frame of page 5 of C: 17
+PAGE TABLE [page,frame]:
+A: [0,0] [1,1] [2,2] [3,3] [4,4] [5,5] [6,6] [7,7]
+C: [0,8] [1,9] [2,10] [3,11] [4,16] [5,17] [6,18] [7,19] [8,20] [9,21]
+[10,22] [11,23]
+"""
+    testMS = MemoryStore()
+    procs = [Process(pid,size,["0/1"]) for pid, size in (('A',"8"),('B',"4"),('D',"4"))]
+    for proc in procs:
+        testMS.addProcessPageTable(proc)
+    testMS.removeProcess(procs[1])
+    testMS.addProcessPageTable(Process('C',"12",["0/1"]))
+    testMS.removeProcess(procs[2])
+    realOutput = "runs of C: {0}\n".format(testMS.pageTable.getRuns('C'))
+    realOutput += "frame of page 5 of C: {0}\n".format(testMS.pageTable.getFrame('C',5))
+    realOutput += testMS.formatPageTable()
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that partial compaction clears the cheapest region by moving its processes into other holes, leaving everything else in place
+"""
+def testPartialCompaction():
+    expectedOutput = """memory locations before placing E: [[8, 8], [32, 8], [44, 4]]
+E placed at: 32
+C moved to: 8
+memory locations after placing E: [[12, 4]]
+frames moved: 4
+"""
+    realOutput = ""
+    testMS = MemoryStore(numFrames=64, compaction=CompactionPolicy.partial)
+    procs = [Process(pid,size,["0/1"]) for pid, size in (('A',"8"),('B',"16"),('C',"4"),('D',"16"))]
+    for proc, loc in zip(procs, (0,16,40,48)):
+        testMS.addProcessAtLocation(proc,loc)
+    realOutput += "memory locations before placing E: {0}\n".format(testMS.getFreeMemoryLocations())
+    procE = Process('E',"16",["0/1"])
+    testMS.addProcessBest(procE)
+    realOutput += "E placed at: {0}\n".format(procE.memLocation)
+    realOutput += "C moved to: {0}\n".format(procs[2].memLocation)
+    realOutput += "memory locations after placing E: {0}\n".format(testMS.getFreeMemoryLocations())
+    realOutput += "frames moved: {0}\n".format(testMS.framesMoved)
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that a run's metrics count its placements, skips and defragmentations, sample utilization and fragmentation after every event, and are
+exported as a JSON summary and a CSV time series
+"""
+def testMetrics():
+    expectedOutput = """placements: 4, skips: 1, defragmentations: 1 moving 4 frames
+placement calls timed: {'addProcessFirst': 5}
+after B is removed: utilization 0.5, fragmentation 0.5, 2 holes
+mean utilization: 0.5
+csv header: simTime,event,pid,utilization,fragmentation,freeFrames,holes,largestHole,internalFragmentation,queueDepth
+csv rows: 9
+"""
+    realOutput = ""
+    specs = [Process(pid,size,pairs).spec for pid, size, pairs in (('A',"4",["0/10"]),('B',"4",["0/2"]),('C',"4",["0/10"]),('D',"20",["1/1"]),
+                                                                    ('E',"8",["3/1"]))]
+    metricsFile = os.path.join(tempfile.mkdtemp(), "metrics")
+    Simulator(specs, MemoryAlgorithm.firstFit, True, OutputLevel.summary, OutputWriter(io.StringIO()), numFrames=16, metricsFile=metricsFile).run()
+    with open(metricsFile + ".json") as f:
+        summary = json.load(f)
+    realOutput += "placements: {0}, skips: {1}, defragmentations: {2} moving {3} frames\n".format(summary["placements"], summary["skips"],
+                                                                                                    summary["defrags"], summary["framesMoved"])
+    realOutput += "placement calls timed: {0}\n".format({method: latency["count"] for method, latency in summary["placementLatency"].items()})
+    with open(metricsFile + ".csv", newline='') as f:
+        rows = list(csv.reader(f))
+    #B leaves two 4-frame holes (AAAA....CCCC....), so half of memory is in use and half of the free memory is out of reach of a single request
+    row = next(r for r in rows if r[1] == "SwitchOut" and r[2] == 'B')
+    realOutput += "after B is removed: utilization {0}, fragmentation {1}, {2} holes\n".format(row[3], row[4], row[6])
+    realOutput += "mean utilization: {0}\n".format(summary["meanUtilization"])
+    realOutput += "csv header: {0}\n".format(','.join(rows[0]))
+    realOutput += "csv rows: {0}\n".format(len(rows) - 1)
+    os.remove(metricsFile + ".json")
+    os.remove(metricsFile + ".csv")
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that converting a text input file to a binary trace and reading it back gives the same processes, and the same simulation
+"""
+def testBinaryTraceRoundTrip():
+    expectedOutput = """p2-input01.txt: same specs True, same simulation True
+p2-input02.txt: same specs True, same simulation True
+p2-input03.txt: same specs True, same simulation True
+"""
+    realOutput = ""
+    binaryFile = os.path.join(tempfile.mkdtemp(), "trace.bin")
+    for name in ("p2-input01.txt", "p2-input02.txt", "p2-input03.txt"):
+        textFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample-inputs", name)
+        textSpecs = readInput(textFile)
+        writeBinaryTrace(textSpecs, binaryFile)
+        binarySpecs = list(BinaryTraceReader(binaryFile))
+        outputs = []
+        for specs in (textSpecs, binarySpecs):
+            stream = io.StringIO()
+            Simulator(specs, MemoryAlgorithm.bestFit, True, OutputLevel.full, OutputWriter(stream)).run()
+            outputs.append(stream.getvalue())
+        realOutput += "{0}: same specs {1}, same simulation {2}\n".format(name, repr(binarySpecs) == repr(textSpecs), outputs[0] == outputs[1])
+    os.remove(binaryFile)
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that the batched simulator reports the same summary for every trace as the scalar Simulator, for each memory configuration it supports
+"""
+def testBatchSimulator():
+    expectedOutput = """firstFit: 0 of 8 traces differ
+bestFit: 0 of 8 traces differ
+nonContiguous: 0 of 8 traces differ
+"""
+    if (BatchSimulator.np == None):
+        print("testBatchSimulator skipped: NumPy is not installed")
+        return True
+    realOutput = ""
+    traces = [list(TraceGenerator(seed, 26, 1, 16).generateSpecs()) for seed in range(8)]
+    for algo, contiguous in ((MemoryAlgorithm.firstFit, True), (MemoryAlgorithm.bestFit, True), (None, False)):
+        results = BatchSimulator.BatchSimulator(traces, algo, contiguous, 64, 1).run()
+        mismatches = sum(BatchSimulator.getScalarSummary(specs, algo, contiguous, 64, 1) != result for specs, result in zip(traces, results))
+        realOutput += "{0}: {1} of {2} traces differ\n".format(algo.name if contiguous else "nonContiguous", mismatches, len(traces))
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that a sweep caches every run it computes, so that growing the grid only computes the new cells, and that a cache entry is tied to the
+contents of its trace rather than its file name
+"""
+def testSweepCache():
+    expectedOutput = """first sweep: 1 of 1 runs computed
+sweep with another memory size: 1 of 2 runs computed
+cached run matches: True
+key changed with the trace's contents: True
+sweep of the changed trace: 2 of 2 runs computed
+"""
+    realOutput = ""
+    workDir = tempfile.mkdtemp()
+    traceFile = os.path.join(workDir, "trace.txt")
+    cacheDir = os.path.join(workDir, "cache")
+    with open(traceFile, 'w') as f:
+        f.write("A 12 0/10\nB 40 2/5\nC 20 3/1\n")
+    results, computed = Sweep([traceFile], ["bestFit"], [32], [1], ["full"], cacheDir).run(1)
+    realOutput += "first sweep: {0} of {1} runs computed\n".format(computed, len(results))
+    moreResults, computed = Sweep([traceFile], ["bestFit"], [32, 64], [1], ["full"], cacheDir).run(1)
+    realOutput += "sweep with another memory size: {0} of {1} runs computed\n".format(computed, len(moreResults))
+    realOutput += "cached run matches: {0}\n".format(moreResults[0]["summary"] == results[0]["summary"])
+    config = {"algo": "bestFit", "numFrames": 32, "t_memmove": 1, "compaction": "full"}
+    key = getCacheKey(hashTrace(traceFile), config)
+    with open(traceFile, 'a') as f:
+        f.write("D 4 5/1\n")
+    realOutput += "key changed with the trace's contents: {0}\n".format(getCacheKey(hashTrace(traceFile), config) != key)
+    results, computed = Sweep([traceFile], ["bestFit"], [32, 64], [1], ["full"], cacheDir).run(1)
+    realOutput += "sweep of the changed trace: {0} of {1} runs computed\n".format(computed, len(results))
+    shutil.rmtree(workDir)
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that a streamed run matches one that reads its input up front, that input out of order by no more than the lookahead is merged back into
+arrival order, and that input further out of order than that is rejected
+"""
+def testArrivalSource():
+    expectedOutput = """arrivals with a lookahead of 2: A@0 B@10 C@20 D@30 A@40
+sorted input streamed matches the input read up front: True
+unsorted input streamed with a lookahead of 2 matches the input read up front: True
+input two places out of order streamed with a lookahead of 1: process A arrives at 0ms, after arrivals at 10ms were already simulated; increase the lookahead or sort the input by arrival time
+"""
+    realOutput = ""
+    pidSizePairs = (('A',"8",["0/15","40/5"]),('B',"8",["10/5"]),('C',"12",["20/25"]),('D',"20",["30/5"]))
+    sortedSpecs = [Process(pid,size,pairs).spec for pid, size, pairs in pidSizePairs]
+    #each process is at most one place away from where it belongs
+    unsortedSpecs = [sortedSpecs[i] for i in (1, 0, 3, 2)]
+    #A is two places away from where it belongs, so B has already arrived by the time A is read with a lookahead of 1
+    farUnsortedSpecs = [sortedSpecs[i] for i in (1, 2, 0, 3)]
+    arrivals = ArrivalSource((Process(spec) for spec in unsortedSpecs), 2)
+    order = []
+    while (arrivals.peek() != None):
+        time, proc = arrivals.next()
+        order.append("{0}@{1}".format(proc.pid, time))
+    realOutput += "arrivals with a lookahead of 2: {0}\n".format(' '.join(order))
+
+    #run a simulation of the specified specs, streaming them from a generator with the specified lookahead (None reads them all up front)
+    def runSimulation(specs, lookahead):
+        stream = io.StringIO()
+        Simulator((spec for spec in specs), MemoryAlgorithm.bestFit, True, OutputLevel.events, OutputWriter(stream), lookahead, numFrames=32).run()
+        return stream.getvalue()
+    expectedRun = runSimulation(sortedSpecs, None)
+    realOutput += "sorted input streamed matches the input read up front: {0}\n".format(runSimulation(sortedSpecs, 1) == expectedRun)
+    realOutput += "unsorted input streamed with a lookahead of 2 matches the input read up front: {0}\n".format(
+        runSimulation(unsortedSpecs, 2) == expectedRun)
+    try:
+        runSimulation(farUnsortedSpecs, 1)
+        realOutput += "input two places out of order streamed with a lookahead of 1: no error\n"
+    except ArrivalOrderError as e:
+        realOutput += "input two places out of order streamed with a lookahead of 1: {0}\n".format(e)
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that processes which cannot be placed wait in the admission queue until a departure makes room, giving up when they arrive again
+"""
+def testAdmissionQueue():
+    expectedOutput = """time 0ms: Simulator started (Contiguous -- Best-Fit)
+time 0ms: Process A arrived (requires 12 frames)
+time 0ms: Placed process A:
+time 0ms: Process D arrived (requires 2 frames)
+time 0ms: Placed process D:
+time 2ms: Process B arrived (requires 8 frames)
+time 2ms: Cannot place process B -- waiting
+time 3ms: Process C arrived (requires 20 frames)
+time 3ms: Cannot place process C -- waiting
+time 5ms: Process D arrived (requires 2 frames)
+time 5ms: Process D is still in memory -- skipped!
+time 9ms: Process B arrived (requires 8 frames)
+time 9ms: Process B gave up waiting -- skipped!
+time 9ms: Cannot place process B -- waiting
+time 10ms: Process A removed:
+time 10ms: Placed process B after waiting 1ms:
+time 10ms: Process D removed:
+time 13ms: Process B removed:
+time 13ms: Process C gave up waiting -- skipped!
+time 13ms: Simulator ended (Contiguous -- Best-Fit)
+"""
+    stream = io.StringIO()
+    specs = [Process(pid,size,pairs).spec for pid, size, pairs in (('A',"12",["0/10"]),('B',"8",["2/5","9/3"]),('C',"20",["3/1"]),
+                                                                    ('D',"2",["0/10","5/1"]))]
+    sim = Simulator(specs, MemoryAlgorithm.bestFit, True, OutputLevel.events, OutputWriter(stream), numFrames=16, admissionQueue=True)
+    sim.run()
+    realOutput = stream.getvalue()
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that batched steps show memory once per millisecond, and not at all for a step that changes nothing, holding back the dumps of a
+defragmentation and taking in the departures of processes that run for 0ms, with the same event lines as the per-event loop
+"""
+def testBatchSteps():
+    expectedOutput = """time 0ms: Simulator started (Contiguous -- First-Fit)
+time 0ms: Process A arrived (requires 4 frames)
+time 0ms: Placed process A:
+time 0ms: Process B arrived (requires 4 frames)
+time 0ms: Placed process B:
+time 0ms: Process C arrived (requires 2 frames)
+time 0ms: Placed process C:
+time 0ms: Process C removed:
+========
+AAAABBBB
+........
+========
+time 2ms: Process D arrived (requires 20 frames)
+time 2ms: Cannot place process D -- skipped!
+time 5ms: Process A removed:
+time 5ms: Process E arrived (requires 10 frames)
+time 5ms: Cannot place process E -- starting defragmentation
+time 9ms: Defragmentation complete (moved 4 frames: B)
+time 9ms: Placed process E:
+========
+BBBBEEEE
+EEEEEE..
+========
+time 12ms: Process E removed:
+========
+BBBB....
+........
+========
+time 14ms: Process B removed:
+========
+........
+........
+========
+time 14ms: Simulator ended (Contiguous -- First-Fit)
+event lines match the per-event loop: True
+"""
+    specs = [Process(pid,size,pairs).spec for pid, size, pairs in (('A',"4",["0/5"]),('B',"4",["0/10"]),('C',"2",["0/0"]),('D',"20",["2/1"]),
+                                                                    ('E',"10",["5/3"]))]
+    stream = io.StringIO()
+    Simulator(specs, MemoryAlgorithm.firstFit, True, OutputLevel.full, OutputWriter(stream), numFrames=16, framesPerLine=8, batchSteps=True).run()
+    realOutput = stream.getvalue()
+    perEventStream = io.StringIO()
+    Simulator(specs, MemoryAlgorithm.firstFit, True, OutputLevel.full, OutputWriter(perEventStream), numFrames=16, framesPerLine=8).run()
+    eventLines = [line for line in realOutput.split('\n') if line.startswith("time")]
+    perEventLines = [line for line in perEventStream.getvalue().split('\n') if line.startswith("time")]
+    realOutput += "event lines match the per-event loop: {0}\n".format(eventLines == perEventLines)
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that arrivals are routed to the least loaded shard, and that a defragmentation on one shard does not delay the other
+"""
+def testShardedSimulator():
+    expectedOutput = """time 0ms: Simulator started (Sharded -- 2 shards, leastLoaded routing)
+[shard 0] time 0ms: Process A arrived (requires 2 frames)
+[shard 0] time 0ms: Placed process A:
+[shard 1] time 0ms: Process B arrived (requires 2 frames)
+[shard 1] time 0ms: Placed process B:
+[shard 0] time 0ms: Process C arrived (requires 4 frames)
+[shard 0] time 0ms: Placed process C:
+[shard 1] time 1ms: Process D arrived (requires 4 frames)
+[shard 1] time 1ms: Placed process D:
+[shard 0] time 5ms: Process A removed:
+[shard 0] time 6ms: Process E arrived (requires 4 frames)
+[shard 0] time 6ms: Cannot place process E -- starting defragmentation
+[shard 0] time 10ms: Defragmentation complete (moved 4 frames: C)
+[shard 0] time 10ms: Placed process E:
+[shard 1] time 7ms: Process F arrived (requires 1 frames)
+[shard 1] time 7ms: Placed process F:
+[shard 1] time 8ms: Process F removed:
+[shard 0] time 13ms: Process E removed:
+[shard 1] time 20ms: Process B removed:
+[shard 1] time 21ms: Process D removed:
+[shard 0] time 24ms: Process C removed:
+time 24ms: Simulator ended (Sharded -- 2 shards, leastLoaded routing)
+shard 0 (Contiguous -- Best-Fit, 8 frames): ended at 24ms, placed 3 processes, skipped 0, 1 defragmentations moving 4 frames
+shard 1 (Contiguous -- First-Fit, 8 frames): ended at 21ms, placed 3 processes, skipped 0, 0 defragmentations moving 0 frames
+all shards: placed 6 processes, skipped 0, 1 defragmentations moving 4 frames
+"""
+    stream = io.StringIO()
+    specs = [Process(pid,size,pairs).spec for pid, size, pairs in (('A',"2",["0/5"]),('B',"2",["0/20"]),('C',"4",["0/20"]),('D',"4",["1/20"]),
+                                                                    ('E',"4",["6/3"]),('F',"1",["7/1"]))]
+    sim = ShardedSimulator(specs, [(MemoryAlgorithm.bestFit,True,8),(MemoryAlgorithm.firstFit,True,8)], RoutingPolicy.leastLoaded,
+                           OutputLevel.events, OutputWriter(stream))
+    sim.run()
+    realOutput = stream.getvalue()
+    return compareOutput(realOutput, expectedOutput)
+
+"""
+test that a run resumed from a checkpoint produces the same output as a run that was never interrupted
+"""
+def testCheckpointResume():
+    #stands in for a run that dies just after its second checkpoint
+    class CrashingCheckpointer(Checkpointer):
+        def save(self, sim):
+            Checkpointer.save(self, sim)
+            if (self.deltaCount == 1):
+                raise KeyboardInterrupt()
+
+    specs = [Process(pid,size,pairs).spec for pid, size, pairs in (('A',"45",["0/350","400/50"]),('B',"28",["0/2650"]),('C',"58",["0/950","1100/100"]),
+                                                                    ('D',"86",["0/650","1350/450"]),('E',"14",["0/1400"]),('F',"24",["100/380","500/475"]),
+                                                                    ('G',"13",["435/815"]),('J',"46",["550/900"]))]
+    expectedStream = io.StringIO()
+    Simulator(specs, MemoryAlgorithm.nextFit, True, OutputLevel.full, OutputWriter(expectedStream)).run()
+    expectedOutput = expectedStream.getvalue()
+
+    fileName = os.path.join(tempfile.mkdtemp(), "checkpoint")
+    stream = io.StringIO()
+    try:
+        Simulator(specs, MemoryAlgorithm.nextFit, True, OutputLevel.full, OutputWriter(stream), checkpointer=CrashingCheckpointer(fileName, 3)).run()
+    except KeyboardInterrupt:
+        pass
+    context, outputChars, sim = loadCheckpoint(fileName)
+    realOutput = stream.getvalue()[:outputChars]
+    resumedStream = io.StringIO()
+    sim.specs = specs
+    sim.out = OutputWriter(resumedStream)
+    sim.resume()
+    realOutput += resumedStream.getvalue()
+    os.remove(fileName)
+    return compareOutput(realOutput, expectedOutput)
+
 """
 compare expected output to received output, displaying an error if test output does not match expected output
 @param real: the output that was received when running the test
@@ -108,7 +695,7 @@ def compareOutput(real,expected):
     
 
 if __name__ == "__main__":  
-    testList = [testStoreOutput,testFreeMemoryLocations,testAddProcessNext,testAddProcessFirst,testAddProcessBest]
+    testList = [testStoreOutput,testFreeMemoryLocations,testAddProcessNext,testAddProcessFirst,testAddProcessBest,testRemoveProcessCoalesce,testBestFitTieBreak,testRenderAfterChange,testOversizedProcess,testBuddySplitCoalesce,testSegregatedFit,testSegregatedFitRoundUp,testNextFitRover,testPageTableExtents,testPartialCompaction,testMetrics,testBatchSimulator,testSweepCache,testBinaryTraceRoundTrip,testArrivalSource,testAdmissionQueue,testBatchSteps,testShardedSimulator,testCheckpointResume]
     testsPassed = 0
     testsRan = 0
     for func in testList:
@@ -0,0 +1,163 @@
+import csv
+import json
+
+#the lists of rows that only ever grow during a run; checkpoints save them a few rows at a time (see Metrics.takeRows)
+ROW_LISTS = ('samples', 'defragLatency', 'waitTimes')
+
+"""
+The Metrics class records what a Simulator run did and how long it took: counts of placements, skips and defragmentations,
+the wall-clock latency of every placement call and defragmentation, and a time series of memory utilization and fragmentation
+"""
+class Metrics():
+    """
+    Metrics constructor: creates a new, empty set of metrics
+    """
+    def __init__(self):
+        self.placements = 0
+        self.skips = 0
+        self.defrags = 0
+        self.framesMoved = 0
+        #dict of placement method name:[latency in seconds] for every placement call
+        self.placementLatency = {}
+        #latency in seconds of every defragmentation
+        self.defragLatency = []
+        #simulated time in milliseconds that each process admitted from an AdmissionQueue spent waiting, and how many gave up waiting
+        self.waitTimes = []
+        self.expired = 0
+        #one row per event: (simTime, event type, pid, utilization, fragmentation, free frames, holes, largest hole, internal fragmentation,
+        #processes waiting to be placed)
+        self.samples = []
+        #dict of row list name (or placement method name):number of its rows already saved by a checkpoint
+        self.savedRows = {}
+
+    """
+    get the state to save when these metrics are pickled for a checkpoint
+    the rows are left out, since a checkpoint saves only the rows added since the previous one (see takeRows)
+    """
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ROW_LISTS:
+            state[name] = []
+        state['placementLatency'] = {}
+        return state
+
+    """
+    get the rows to save in a checkpoint, and mark them as saved
+    @param allRows: whether to get every row (for a base checkpoint), or only those added since the last call
+    @returns a dict of row list name (or placement method name):rows, to be passed to appendRows when the checkpoint is loaded
+    """
+    def takeRows(self, allRows=False):
+        lists = {name: getattr(self, name) for name in ROW_LISTS}
+        #placement methods are keyed by name alone, which never clashes with a row list name
+        lists.update(self.placementLatency)
+        rows = {}
+        for name, values in lists.items():
+            start = 0 if allRows else self.savedRows.get(name, 0)
+            if (len(values) > start):
+                rows[name] = values[start:]
+            self.savedRows[name] = len(values)
+        return rows
+
+    """
+    add rows saved in a checkpoint back to metrics restored from it
+    @param rows: the rows returned by takeRows
+    """
+    def appendRows(self, rows):
+        for name, values in rows.items():
+            if (name in ROW_LISTS):
+                getattr(self, name).extend(values)
+            else:
+                self.placementLatency.setdefault(name, []).extend(values)
+
+    """
+    record a single call to a placement method
+    @param method: the name of the placement method that was called
+    @param seconds: the wall-clock time the call took, including any defragmentation it triggered
+    @param placed: whether the process was placed (true) or skipped (false)
+    """
+    def recordPlacement(self, method, seconds, placed):
+        self.placementLatency.setdefault(method, []).append(seconds)
+        if (placed):
+            self.placements += 1
+        else:
+            self.skips += 1
+
+    """
+    record a single defragmentation
+    @param seconds: the wall-clock time the defragmentation took
+    @param framesMoved: the number of frames that were moved
+    """
+    def recordDefrag(self, seconds, framesMoved):
+        self.defragLatency.append(seconds)
+        self.defrags += 1
+        self.framesMoved += framesMoved
+
+    """
+    record a waiting process being placed
+    @param waitTime: the simulated time (in milliseconds) the process spent waiting
+    """
+    def recordAdmission(self, waitTime):
+        self.waitTimes.append(waitTime)
+
+    """
+    record a waiting process giving up without being placed
+    """
+    def recordExpiry(self):
+        self.expired += 1
+
+    """
+    sample the state of memory after an event
+    @param simTime: the simulation time at which the event occurred
+    @param event: the event that was just processed
+    @param memStore: the MemoryStore the event acted on
+    @param queueDepth: the number of processes waiting to be placed
+    """
+    def sample(self, simTime, event, memStore, queueDepth=0):
+        freeFrames = memStore.getFreeMemory()
+        largestHole = memStore.getLargestFreeBlock()
+        #external fragmentation: the fraction of free memory that is unusable by a request for the whole of it
+        fragmentation = 1 - largestHole / freeFrames if freeFrames > 0 else 0.0
+        self.samples.append((simTime, event.eType.name, event.process.pid, 1 - freeFrames / memStore.numFrames, fragmentation,
+                             freeFrames, memStore.getFreeBlockCount(), largestHole, memStore.getInternalFragmentation(), queueDepth))
+
+    """
+    summarize a list of latencies
+    @param latencies: the latencies to summarize (in seconds, or milliseconds of simulated time for wait times)
+    @returns a dict of the count, total, mean, median, 99th percentile and maximum (all in the same units as the latencies)
+    """
+    def summarizeLatencies(self, latencies):
+        if (not latencies):
+            return {"count": 0}
+        ordered = sorted(latencies)
+        return {"count": len(ordered), "total": sum(ordered), "mean": sum(ordered) / len(ordered), "p50": ordered[len(ordered)//2],
+                "p99": ordered[min(len(ordered)-1, (len(ordered)*99)//100)], "max": ordered[-1]}
+
+    """
+    get a summary of the run, suitable for writing as JSON
+    """
+    def getSummary(self):
+        return {"placements": self.placements, "skips": self.skips, "defrags": self.defrags, "framesMoved": self.framesMoved,
+                "placementLatency": {method: self.summarizeLatencies(latencies) for method, latencies in self.placementLatency.items()},
+                "defragLatency": self.summarizeLatencies(self.defragLatency),
+                "meanUtilization": sum(s[3] for s in self.samples) / len(self.samples) if self.samples else 0.0,
+                "meanFragmentation": sum(s[4] for s in self.samples) / len(self.samples) if self.samples else 0.0,
+                "internalFragmentation": self.samples[-1][8] if self.samples else 0.0,
+                "waitTime": self.summarizeLatencies(self.waitTimes), "expired": self.expired,
+                "meanQueueDepth": sum(s[9] for s in self.samples) / len(self.samples) if self.samples else 0.0,
+                "maxQueueDepth": max(s[9] for s in self.samples) if self.samples else 0,
+                #placements per second of simulated time
+                "throughput": self.placements * 1000 / self.samples[-1][0] if self.samples and self.samples[-1][0] > 0 else 0.0}
+
+    """
+    write the metrics to disk: a JSON summary and a CSV time series of per-event samples
+    @param jsonFileName: the file to write the summary to
+    @param csvFileName: the file to write the time series to
+    """
+    def export(self, jsonFileName, csvFileName):
+        with open(jsonFileName, 'w') as f:
+            json.dump(self.getSummary(), f, indent=2)
+        with open(csvFileName, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["simTime", "event", "pid", "utilization", "fragmentation", "freeFrames", "holes", "largestHole", "internalFragmentation",
+                             "queueDepth"])
+            writer.writerows(self.samples)
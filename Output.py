@@ -0,0 +1,52 @@
+from enum import Enum
+import sys
+
+"""
+OutputLevel is a simple enum containing each of the levels of detail at which the Simulator can report a run
+"""
+class OutputLevel(Enum):
+    #every event line, followed by a dump of memory (and the page table, when non-contiguous)
+    full = 1
+    #every event line, but no memory dumps
+    events = 2
+    #only the final statistics for each run
+    summary = 3
+
+"""
+The OutputWriter class collects output text and writes it to a stream in large chunks, rather than once per line
+"""
+class OutputWriter():
+    """
+    OutputWriter constructor: creates a new writer for the specified stream
+    @param stream: the stream to which buffered output is written (defaults to standard output)
+    @param bufferSize: the number of characters to accumulate before writing them to the stream
+    """
+    def __init__(self, stream=None, bufferSize=1<<16):
+        self.stream = stream if stream != None else sys.stdout
+        self.bufferSize = bufferSize
+        self.buffer = []
+        self.bufferedChars = 0
+        #number of characters written to the stream so far, so that a checkpoint can record how much of the output it accounts for
+        self.charsWritten = 0
+
+    """
+    add text to the buffer, in the same manner as print
+    @param text: the text to write
+    @param end: the string appended after the text
+    """
+    def write(self, text, end='\n'):
+        self.buffer.append(text)
+        self.buffer.append(end)
+        self.bufferedChars += len(text) + len(end)
+        if (self.bufferedChars >= self.bufferSize):
+            self.flush()
+
+    """
+    write everything in the buffer to the stream
+    """
+    def flush(self):
+        self.stream.write(''.join(self.buffer))
+        self.stream.flush()
+        self.charsWritten += self.bufferedChars
+        self.buffer = []
+        self.bufferedChars = 0
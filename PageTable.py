@@ -0,0 +1,121 @@
+from array import array
+import bisect
+
+"""
+The PageTable class maps the pages of each non-contiguous process to the frames that hold them
+rather than storing one (page, frame) pair per page, each process' pages are stored as extents: runs of consecutive pages held in consecutive
+frames, kept as two parallel arrays of the first page and first frame of each run. a process placed in a single run costs two integers however
+many pages it has, and looking up the frame of any page is a binary search over that process' runs
+"""
+class PageTable():
+    """
+    PageTable constructor: creates a new, empty page table
+    """
+    def __init__(self):
+        #dict of pid:(array of first page of each run, array of first frame of each run, total number of pages)
+        self.extents = {}
+        #pids in sorted order, so that the table can be shown without sorting it every time
+        self.pids = []
+        #dict of pid:formatted page table entries, built the first time each process is shown (its pages never change while it is resident)
+        self.formatted = {}
+
+    """
+    check whether the specified process has any entries in the page table
+    @param pid: the pid of the process
+    """
+    def __contains__(self, pid):
+        return pid in self.extents
+
+    """
+    get the number of processes in the page table
+    """
+    def __len__(self):
+        return len(self.extents)
+
+    """
+    add a process to the page table, replacing any existing entries for the same pid
+    @param pid: the pid of the process
+    @param runs: a list of (first frame, number of frames) runs holding the process' pages, in page order
+    """
+    def add(self, pid, runs):
+        pages = array('q')
+        frames = array('q')
+        numPages = 0
+        for start, length in runs:
+            if (length == 0):
+                continue
+            #extend the previous run rather than starting a new one when the frames carry straight on from it
+            if (not frames or frames[-1] + (numPages - pages[-1]) != start):
+                pages.append(numPages)
+                frames.append(start)
+            numPages += length
+        if (pid not in self.extents):
+            bisect.insort(self.pids, pid)
+        self.extents[pid] = (pages, frames, numPages)
+        self.formatted.pop(pid, None)
+
+    """
+    remove a process from the page table
+    @param pid: the pid of the process
+    @returns a list of (first frame, number of frames) runs that held the process' pages
+    """
+    def remove(self, pid):
+        runs = self.getRuns(pid)
+        del self.extents[pid]
+        del self.pids[bisect.bisect_left(self.pids, pid)]
+        self.formatted.pop(pid, None)
+        return runs
+
+    """
+    get the runs of frames holding a process' pages
+    @param pid: the pid of the process
+    @returns a list of (first frame, number of frames) runs, in page order
+    """
+    def getRuns(self, pid):
+        pages, frames, numPages = self.extents[pid]
+        ends = list(pages[1:]) + [numPages]
+        return [(frames[i], ends[i] - pages[i]) for i in range(len(pages))]
+
+    """
+    get the number of pages held by a process
+    @param pid: the pid of the process
+    """
+    def getPageCount(self, pid):
+        return self.extents[pid][2]
+
+    """
+    look up the frame holding the specified page of a process
+    @param pid: the pid of the process
+    @param page: the page number
+    @returns the frame number holding the page (raises IndexError if the process has no such page)
+    """
+    def getFrame(self, pid, page):
+        pages, frames, numPages = self.extents[pid]
+        if (page < 0 or page >= numPages):
+            raise IndexError(page)
+        i = bisect.bisect_right(pages, page) - 1
+        return frames[i] + page - pages[i]
+
+    """
+    format a single process' entries, with a newline after every 10th entry
+    @param pid: the pid of the process
+    """
+    def formatProcess(self, pid):
+        pages, frames, numPages = self.extents[pid]
+        entries = []
+        for i in range(len(pages)):
+            end = pages[i+1] if i+1 < len(pages) else numPages
+            entries.extend(map("[{0},{1}]".format, range(pages[i], end), range(frames[i], frames[i] + end - pages[i])))
+        rows = [' '.join(entries[i:i+10]) for i in range(0, len(entries), 10)]
+        return "{0}: ".format(pid) + ('\n'.join(rows) + '\n' if rows else '')
+
+    """
+    return a string containing every entry in the page table, ordered by pid
+    """
+    def format(self):
+        out = ["PAGE TABLE [page,frame]:\n"]
+        for pid in self.pids:
+            if (pid not in self.formatted):
+                self.formatted[pid] = self.formatProcess(pid)
+            out.append(self.formatted[pid])
+        return ''.join(out)
@@ -1,9 +1,18 @@
 """
-The Process class represents a single process on our CPU
+InputFormatError is raised when a trace cannot be read as a list of process descriptions
 """
-class Process():
+class InputFormatError(Exception):
+    pass
+
+"""
+The ProcessSpec class holds the parsed description of a process from the input file
+specs are never modified by a run, so a single parsed trace can be shared by any number of simulations without copying
+"""
+class ProcessSpec():
+    __slots__ = ('pid', 'memSize', 'arrivalRunPairs')
+
     """
-    Process contructor: creates a new process with the specified properties
+    ProcessSpec contructor: parses a new process description with the specified properties
     @param pid: the string ID given to the process by the input file; used for tie-breaking
     @param memSize: the number of memory frames required by this process
     @param arrivalRunPairs: a list of arrival time, run time pairs for the process, separated by '/'
@@ -12,32 +21,76 @@ class Process():
         self.pid = pid
         #ensure that memSize is formatted as a valid number
         if (not memSize.isdigit()):
-            raise TypeError()
+            raise InputFormatError("process {0} has an invalid size '{1}'".format(pid, memSize))
         self.memSize = int(memSize)
-        
+
         #read the arrival run pairs one by one, raising an exception if any of them is not a pair or contains non-ints
-        self.arrivalRunPairs = []
+        pairs = []
         for i in arrivalRunPairs:
             ARPair = i.split('/')
             if (not (len(ARPair) == 2 and ARPair[0].isdigit() and ARPair[1].isdigit())):
-                raise TypeError()
-            self.arrivalRunPairs.append( (int(ARPair[0]), int(ARPair[1])) )
-            
+                raise InputFormatError("process {0} has an invalid arrival/run pair '{1}'".format(pid, i))
+            pairs.append( (int(ARPair[0]), int(ARPair[1])) )
+        self.arrivalRunPairs = tuple(pairs)
+
+    """
+    create a spec from values that have already been parsed (e.g. read from a binary trace), skipping validation of the input text
+    @param pid: the string ID of the process
+    @param memSize: the number of memory frames required by this process, as an int
+    @param arrivalRunPairs: a sequence of (arrival time, run time) int pairs
+    """
+    @classmethod
+    def fromValues(cls, pid, memSize, arrivalRunPairs):
+        spec = cls.__new__(cls)
+        spec.pid = pid
+        spec.memSize = memSize
+        spec.arrivalRunPairs = tuple(arrivalRunPairs)
+        return spec
+
+    """
+    return a string displaying this spec's pid, memsize, and arrival/run pairs
+    """
+    def __repr__(self):
+        return "PID {0}: size={1} arrivalRunPairs={2}".format(self.pid,self.memSize,list(self.arrivalRunPairs))
+
+"""
+The Process class represents a single process on our CPU during one simulation run
+it pairs a shared ProcessSpec with the state that the run changes as the process moves in and out of memory
+"""
+class Process():
+    __slots__ = ('spec', 'pid', 'memSize', 'arrivalRunPairs', 'memLocation', 'memEnterTime', 'pairsCompleted', 'pairsArrived')
+
+    """
+    Process contructor: creates a new process with the specified properties
+    @param pid: the string ID given to the process by the input file; used for tie-breaking
+                (alternatively, an already-parsed ProcessSpec, in which case the remaining arguments are omitted)
+    @param memSize: the number of memory frames required by this process
+    @param arrivalRunPairs: a list of arrival time, run time pairs for the process, separated by '/'
+    """
+    def __init__(self, pid, memSize=None, arrivalRunPairs=None):
+        self.spec = pid if isinstance(pid, ProcessSpec) else ProcessSpec(pid, memSize, arrivalRunPairs)
+        #keep direct references to the spec's (immutable) fields, since they are read on every event
+        self.pid = self.spec.pid
+        self.memSize = self.spec.memSize
+        self.arrivalRunPairs = self.spec.arrivalRunPairs
+
         #initialize state info for interacting with the memory store
         self.memLocation = -1
         self.memEnterTime = -1
         self.pairsCompleted = 0
-   
+        #number of the process' arrivals seen so far, so that an arrival can tell which arrival/run pair it starts
+        self.pairsArrived = 0
+
     """
     return a string displaying this process' pid, memsize, and arrival/run pairs
-    """         
+    """
     def __repr__(self):
         return "PID {0}: size={1} arrivalRunPairs={2} memLoc={3} memEnterTime={4}".format(
-            self.pid,self.memSize,self.arrivalRunPairs,self.memLocation,self.memEnterTime)
-                
+            self.pid,self.memSize,list(self.arrivalRunPairs),self.memLocation,self.memEnterTime)
+
     """
     override the less-than operator for priority queue sorting based on memLocation
     @param other: the process we are comparing ourselves to
     """
     def __lt__(self, other):
-        return self.memLocation < other.memLocation
\ No newline at end of file
+        return self.memLocation < other.memLocation
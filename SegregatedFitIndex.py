@@ -0,0 +1,218 @@
+import heapq
+
+#number of bits of a hole's size (below its leading bit) used to pick its second-level bin: each power-of-two range of sizes is split into 2**SL_BITS bins
+SL_BITS = 4
+SL_COUNT = 1 << SL_BITS
+
+"""
+The SegregatedFitIndex class keeps track of the free blocks (holes) in a MemoryStore in segregated size-class bins, in the style of TLSF
+holes are binned first by the position of their leading bit and then by the next SL_BITS bits of their size, with a bitmap recording which bins
+are non-empty, so that finding a hole, splitting a hole and freeing a block (with coalescing) each take a constant number of steps however many
+holes there are. as in TLSF, a request is rounded up to the first bin whose holes are all big enough, so a hole in the request's own bin is only
+used after a defragmentation. each bin also keeps a heap of its hole sizes for getLargestHole, from which removed holes are dropped lazily, so
+that keeping it up to date costs O(log n) at worst. it offers the same interface as HoleIndex, so a MemoryStore may use either one
+"""
+class SegregatedFitIndex():
+    """
+    SegregatedFitIndex constructor: creates a new index containing a single hole spanning the entire store
+    @param numFrames: the number of frames in the store we are indexing
+    """
+    def __init__(self, numFrames):
+        self.numFrames = numFrames
+        self.numLevels = self.getBin(max(1, numFrames))[0] + 1
+        self.reset([[0, numFrames]] if numFrames > 0 else [])
+
+    """
+    replace the contents of the index with the specified holes
+    @param holes: a list of [start, length] extents, with no two extents adjacent
+    """
+    def reset(self, holes):
+        #dict of start:length and dict of end:start for every hole, so that a freed block finds its neighbours directly
+        self.holesByStart = {}
+        self.holesByEnd = {}
+        #one dict of start:length per bin (indexed by firstLevel*SL_COUNT + secondLevel), plus bitmaps of the non-empty bins
+        self.bins = [{} for i in range(self.numLevels * SL_COUNT)]
+        #a heap of (-length, start) per bin, which may still hold entries for holes that have since been removed (see getBinLargest)
+        self.binHeaps = [[] for i in range(self.numLevels * SL_COUNT)]
+        self.firstLevelMap = 0
+        self.secondLevelMaps = [0]*self.numLevels
+        self.freeFrames = 0
+        for start, length in holes:
+            self.addHole(start, length)
+
+    """
+    rebuild the index from scratch by scanning a memory string
+    @param memory: the memory string to scan, where '.' marks a free frame
+    """
+    def rebuild(self, memory):
+        holes = []
+        pos = memory.find('.')
+        while (pos != -1):
+            #find the end of this block of free memory, then resume searching after it
+            end = pos
+            while (end < len(memory) and memory[end] == '.'):
+                end += 1
+            holes.append([pos, end-pos])
+            pos = memory.find('.', end)
+        self.reset(holes)
+
+    """
+    get the bin that holds holes of the specified size
+    @param size: the size of the hole
+    @returns the (first level, second level) of the bin
+    """
+    def getBin(self, size):
+        #sizes below SL_COUNT each get a bin of their own in the first level
+        if (size < SL_COUNT):
+            return 0, size
+        leadingBit = size.bit_length() - 1
+        return leadingBit - SL_BITS + 1, (size >> (leadingBit - SL_BITS)) - SL_COUNT
+
+    """
+    get the first bin whose holes are all guaranteed to be at least the specified size
+    @param size: the size required
+    @returns the (first level, second level) of the bin
+    """
+    def getSearchBin(self, size):
+        if (size >= SL_COUNT):
+            #round up to the start of the next bin, unless size already starts a bin
+            size += (1 << (size.bit_length() - 1 - SL_BITS)) - 1
+        return self.getBin(size)
+
+    """
+    add a hole to the index
+    @param start: the first frame of the hole
+    @param length: the number of frames in the hole
+    """
+    def addHole(self, start, length):
+        firstLevel, secondLevel = self.getBin(length)
+        index = firstLevel*SL_COUNT + secondLevel
+        self.bins[index][start] = length
+        heapq.heappush(self.binHeaps[index], (-length, start))
+        self.firstLevelMap |= 1 << firstLevel
+        self.secondLevelMaps[firstLevel] |= 1 << secondLevel
+        self.holesByStart[start] = length
+        self.holesByEnd[start+length] = start
+        self.freeFrames += length
+
+    """
+    remove a hole from the index
+    @param start: the first frame of the hole
+    @param length: the number of frames in the hole
+    """
+    def removeHole(self, start, length):
+        firstLevel, secondLevel = self.getBin(length)
+        index = firstLevel*SL_COUNT + secondLevel
+        holes = self.bins[index]
+        del holes[start]
+        heap = self.binHeaps[index]
+        if (not holes):
+            heap.clear()
+            self.secondLevelMaps[firstLevel] &= ~(1 << secondLevel)
+            if (self.secondLevelMaps[firstLevel] == 0):
+                self.firstLevelMap &= ~(1 << firstLevel)
+        elif (len(heap) > 2*len(holes) + SL_COUNT):
+            #the heap's entry for this hole is left in place, so rebuild the heap once most of its entries are for removed holes
+            heap[:] = [(-holeLength, holeStart) for holeStart, holeLength in holes.items()]
+            heapq.heapify(heap)
+        del self.holesByStart[start]
+        del self.holesByEnd[start+length]
+        self.freeFrames -= length
+
+    """
+    get a list of every hole, sorted by start
+    """
+    def getHoles(self):
+        return sorted([start, length] for start, length in self.holesByStart.items())
+
+    """
+    get the number of holes
+    """
+    def getHoleCount(self):
+        return len(self.holesByStart)
+
+    """
+    get the largest hole in a non-empty bin, first dropping the heap entries of any holes that have been removed from it
+    @param index: the index of the bin
+    @returns the (length, start) of the bin's largest hole
+    """
+    def getBinLargest(self, index):
+        heap = self.binHeaps[index]
+        holes = self.bins[index]
+        while (holes.get(heap[0][1]) != -heap[0][0]):
+            heapq.heappop(heap)
+        return -heap[0][0], heap[0][1]
+
+    """
+    get the size of the largest hole, or 0 if there are no holes
+    """
+    def getLargestHole(self):
+        if (self.firstLevelMap == 0):
+            return 0
+        #the largest hole is in the highest non-empty bin
+        firstLevel = self.firstLevelMap.bit_length() - 1
+        secondLevel = self.secondLevelMaps[firstLevel].bit_length() - 1
+        return self.getBinLargest(firstLevel*SL_COUNT + secondLevel)[0]
+
+    """
+    find a hole that can contain a block of the specified size, taking the oldest hole from the first non-empty bin that is large enough
+    @param size: the number of frames required
+    @param exactBin: whether to fall back on the largest hole of the request's own bin when every larger bin is empty (used only after a
+                     defragmentation, which may leave a single hole that is big enough but shares the request's bin)
+    @returns the start of the chosen hole, or None if no hole is large enough
+    """
+    def findFit(self, size, exactBin=False):
+        firstLevel, secondLevel = self.getSearchBin(size)
+        if (firstLevel < self.numLevels):
+            #look for a non-empty bin at or above secondLevel on this level, or failing that any non-empty bin on a higher level
+            secondLevelMap = self.secondLevelMaps[firstLevel] & (-1 << secondLevel)
+            if (secondLevelMap == 0):
+                firstLevelMap = self.firstLevelMap & (-1 << (firstLevel + 1))
+                if (firstLevelMap != 0):
+                    firstLevel = (firstLevelMap & -firstLevelMap).bit_length() - 1
+                    secondLevelMap = self.secondLevelMaps[firstLevel]
+            if (secondLevelMap != 0):
+                secondLevel = (secondLevelMap & -secondLevelMap).bit_length() - 1
+                return next(iter(self.bins[firstLevel*SL_COUNT + secondLevel]))
+
+        #every larger bin is empty, but the bin holding holes of exactly this size may still contain one that is big enough: its largest
+        firstLevel, secondLevel = self.getBin(size)
+        if (exactBin and firstLevel < self.numLevels and self.bins[firstLevel*SL_COUNT + secondLevel]):
+            length, start = self.getBinLargest(firstLevel*SL_COUNT + secondLevel)
+            if (length >= size):
+                return start
+        return None
+
+    """
+    mark the specified block as allocated, splitting the hole that begins at it
+    @param loc: the first frame of the block; must be the start of a hole
+    @param size: the number of frames in the block; the whole block must currently be free
+    """
+    def allocate(self, loc, size):
+        if (size == 0):
+            return
+        length = self.holesByStart[loc]
+        self.removeHole(loc, length)
+        if (length > size):
+            self.addHole(loc+size, length-size)
+
+    """
+    mark the specified block as free, coalescing it with any neighbouring holes
+    @param loc: the first frame of the block
+    @param size: the number of frames in the block; the whole block must currently be allocated
+    """
+    def free(self, loc, size):
+        if (size == 0):
+            return
+        start = loc
+        end = loc + size
+        #merge with the preceding hole if it ends exactly where we begin
+        if (loc in self.holesByEnd):
+            start = self.holesByEnd[loc]
+            self.removeHole(start, loc-start)
+        #merge with the following hole if it begins exactly where we end
+        if (end in self.holesByStart):
+            length = self.holesByStart[end]
+            self.removeHole(end, length)
+            end += length
+        self.addHole(start, end-start)
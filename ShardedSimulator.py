@@ -0,0 +1,176 @@
+from enum import Enum
+import random
+import zlib
+from ArrivalSource import ArrivalSource
+from Event import Event, EventType
+from MemoryStore import MemoryAlgorithm, CompactionPolicy
+from Output import OutputLevel, OutputWriter
+from Process import Process
+from Simulator import Simulator
+
+"""
+RoutingPolicy is a simple enum containing the ways an arrival may be assigned to a shard
+"""
+class RoutingPolicy(Enum):
+    #the shard with the smallest fraction of its frames in use
+    leastLoaded = 1
+    #the shard with the largest hole (or the most free frames, when non-contiguous)
+    largestHole = 2
+    #a fixed shard chosen from a hash of the pid, so that every arrival of a process goes to the same shard
+    hash = 3
+    #the less loaded of two shards chosen at random
+    powerOfTwo = 4
+
+"""
+The ShardedSimulator class simulates a fleet of memory stores (shards), each with its own algorithm and size, fed by a single stream of arrivals
+each shard is a Simulator of its own, with its own clock offset and event queue, so a defragmentation pushes back only that shard's events
+(including the arrivals already routed to it) and never stalls the others. arrivals are routed to a shard at their arrival time by a RoutingPolicy,
+and the shards' events are then interleaved in order of their time
+"""
+class ShardedSimulator():
+    """
+    ShardedSimulator constructor: create a new fleet simulation for the specified processes
+    @param specs: the ProcessSpecs to simulate; either a list (which is shared, never modified), or a generator that is read lazily
+    @param shards: a list of (MemoryAlgorithm, contiguous, numFrames) configurations, one per shard
+    @param routing: the RoutingPolicy used to assign arrivals to shards
+    @param outputLevel: the OutputLevel at which to report the run
+    @param out: the OutputWriter to which all output is written (defaults to a new writer on standard output)
+    @param lookahead: how many processes to read ahead of the simulation (see ArrivalSource); None reads them all up front
+    @param framesPerLine: how many frames of memory to output per-line
+    @param t_memmove: the time (in milliseconds) it takes to move one frame of memory during defragmentation
+    @param metricsFile: if given, collect Metrics for each shard and write them to metricsFile-shard<i>.json and .csv at the end
+    @param compaction: the CompactionPolicy used by every shard
+    @param seed: the seed for the random choices made by powerOfTwo routing, so that runs are repeatable
+    """
+    def __init__(self, specs=None, shards=((MemoryAlgorithm.bestFit, True, 256),), routing=RoutingPolicy.leastLoaded, outputLevel=OutputLevel.full,
+                 out=None, lookahead=None, framesPerLine=32, t_memmove=1, metricsFile=None, compaction=CompactionPolicy.full, seed=0):
+        if (len(shards) == 0):
+            raise ValueError("a sharded simulation needs at least one shard")
+        self.specs = specs if specs != None else []
+        self.routing = routing
+        self.outputLevel = outputLevel
+        self.lookahead = lookahead
+        self.out = out if out != None else OutputWriter()
+        self.random = random.Random(seed)
+        self.shards = []
+        for algo, contiguous, numFrames in shards:
+            shard = Simulator(None, algo, contiguous, outputLevel, self.out, lookahead, numFrames, framesPerLine, t_memmove,
+                              "{0}-shard{1}".format(metricsFile, len(self.shards)) if metricsFile != None else None, compaction)
+            shard.logPrefix = "[shard {0}] ".format(len(self.shards))
+            self.shards.append(shard)
+        self.simTime = 0
+        #dict of pid:(index of the shard its latest arrival was routed to, number of its arrivals routed so far)
+        self.routed = {}
+
+    """
+    get the fraction of a shard's frames that are in use
+    @param shard: the shard's Simulator
+    """
+    def getLoad(self, shard):
+        return 1 - shard.memStore.getFreeMemory() / shard.numFrames
+
+    """
+    choose the shard to which an arrival is routed, according to our RoutingPolicy
+    @param proc: the arriving process
+    @returns the index of the chosen shard
+    """
+    def chooseShard(self, proc):
+        #a process still running (or waiting to run) an earlier pair stays on its shard, which keeps its pairs in order
+        if (proc.pid in self.routed):
+            shardIndex, routedPairs = self.routed[proc.pid]
+            if (proc.pairsCompleted < routedPairs):
+                return shardIndex
+        indices = range(len(self.shards))
+        if (self.routing == RoutingPolicy.leastLoaded):
+            return min(indices, key=lambda i: self.getLoad(self.shards[i]))
+        if (self.routing == RoutingPolicy.largestHole):
+            return max(indices, key=lambda i: (self.shards[i].getAdmissionLimit(), -i))
+        if (self.routing == RoutingPolicy.hash):
+            #crc32 rather than hash(), since string hashes change from one run of Python to the next
+            return zlib.crc32(proc.pid.encode()) % len(self.shards)
+        #power of two choices: sample two distinct shards (or the only one), and take the less loaded of them
+        choices = sorted(self.random.sample(indices, min(2, len(self.shards))))
+        return min(choices, key=lambda i: self.getLoad(self.shards[i]))
+
+    """
+    route an arrival to a shard, queueing it there at the same time relative to that shard's clock offset
+    @param time: the arrival time
+    @param proc: the arriving process
+    """
+    def route(self, time, proc):
+        shardIndex = self.chooseShard(proc)
+        routedPairs = self.routed[proc.pid][1] if proc.pid in self.routed else 0
+        self.routed[proc.pid] = (shardIndex, routedPairs + 1)
+        #like any pending arrival, this one is pushed back by every defragmentation of its shard so far
+        self.shards[shardIndex].events.put(Event(EventType.SwitchIn, time, proc))
+
+    """
+    find the shard holding the earliest pending event across the whole fleet
+    @returns the (time, event type, pid, shard index) of that event, or None if every shard's event queue is empty
+    """
+    def peekNextEvent(self):
+        nextEvent = None
+        for i in range(len(self.shards)):
+            shard = self.shards[i]
+            if (not shard.events.empty()):
+                event = shard.events.peek()
+                key = (event.time + shard.timeOffset, event.eType.value, event.process.pid, i)
+                if (nextEvent == None or key < nextEvent):
+                    nextEvent = key
+        return nextEvent
+
+    """
+    get the name of the fleet configuration we are simulating, as shown in the start and stop messages
+    """
+    def getConfigName(self):
+        return "Sharded -- {0} shards, {1} routing".format(len(self.shards), self.routing.name)
+
+    """
+    show the statistics of every shard, and of the fleet as a whole
+    """
+    def showResults(self):
+        for i in range(len(self.shards)):
+            shard = self.shards[i]
+            self.out.write("shard {0} ({1}, {2} frames): ended at {3}ms, placed {4} processes, skipped {5}, {6} defragmentations moving {7} frames".format(
+                i, shard.getConfigName(), shard.numFrames, shard.simTime, shard.placedCount, shard.skippedCount, shard.memStore.defragCount,
+                shard.memStore.framesMoved))
+        self.out.write("all shards: placed {0} processes, skipped {1}, {2} defragmentations moving {3} frames".format(
+            sum(shard.placedCount for shard in self.shards), sum(shard.skippedCount for shard in self.shards),
+            sum(shard.memStore.defragCount for shard in self.shards), sum(shard.memStore.framesMoved for shard in self.shards)))
+
+    """
+    run the simulation
+    """
+    def run(self):
+        if (self.outputLevel != OutputLevel.summary):
+            self.out.write("time 0ms: Simulator started ({0})".format(self.getConfigName()))
+
+        #each spec gets its own Process record for this run, shared by every shard it is routed to
+        arrivals = ArrivalSource((Process(spec) for spec in self.specs), self.lookahead)
+        while (True):
+            nextEvent = self.peekNextEvent()
+            #route an arrival only once it would be the next event processed, so that the routing sees every earlier event's effect on the shards
+            nextArrival = arrivals.peek()
+            if (nextArrival != None and (nextEvent == None or (nextArrival[0], EventType.SwitchIn.value, nextArrival[1].pid) < nextEvent[:3])):
+                self.route(*arrivals.next())
+                continue
+            if (nextEvent == None):
+                break
+
+            #process the earliest event on the shard it belongs to, against that shard's own clock
+            shard = self.shards[nextEvent[3]]
+            currEvent = shard.events.get()
+            shard.simTime = nextEvent[0]
+            self.simTime = max(self.simTime, shard.simTime)
+            shard.processEvent(currEvent)
+            shard.eventCount += 1
+            if (shard.metrics != None):
+                shard.metrics.sample(shard.simTime, currEvent, shard.memStore, shard.getQueueDepth())
+            self.simTime = max(self.simTime, shard.simTime)
+
+        self.out.write("time {0}ms: Simulator ended ({1})".format(self.simTime, self.getConfigName()))
+        self.showResults()
+        self.out.flush()
+        for shard in self.shards:
+            if (shard.metricsFile != None):
+                shard.metrics.export(shard.metricsFile + ".json", shard.metricsFile + ".csv")
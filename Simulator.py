@@ -1,134 +1,410 @@
-import queue
-from Event import Event, EventType
-from MemoryStore import MemoryStore, MemoryAlgorithm
-import sys
-
-#set 'this' to point to this module, so we can maintain module-wide globals
-this = sys.modules[__name__]
+import time
+from AdmissionQueue import AdmissionQueue
+from ArrivalSource import ArrivalSource
+from Event import Event, EventType, EventQueue
+from MemoryStore import MemoryStore, MemoryAlgorithm, CompactionPolicy
+from Metrics import Metrics
+from Output import OutputLevel, OutputWriter
+from Process import Process
+from SegregatedFitIndex import SegregatedFitIndex
 
 """
-The Simulator class is a static class responsible for emulating our CPU, Running through the input processes using the selected algorithm
+The Simulator class is responsible for emulating our CPU, Running through the input processes using the selected algorithm
+each instance owns its own clock, event queue and memory store, so several simulations may run side by side
 """
-this.algo = MemoryAlgorithm.bestFit
-this.simTime = 0
-this.processes = []
-this.events = queue.PriorityQueue()
-this.contiguous = True
-this.memStore = MemoryStore()
+class Simulator():
+    """
+    Simulator constructor: create a new simulator for the specified processes and memory configuration
+    @param specs: the ProcessSpecs to simulate; either a list (which is shared, never modified), or a generator that is read lazily as the run progresses
+    @param algo: the MemoryAlgorithm used for contiguous placement (ignored when non-contiguous)
+    @param contiguous: whether memory is allocated contiguously (true) or through a page table (false)
+    @param outputLevel: the OutputLevel at which to report the run
+    @param out: the OutputWriter to which all output is written (defaults to a new writer on standard output)
+    @param lookahead: how many processes to read ahead of the simulation (see ArrivalSource); None reads them all up front
+    @param numFrames: the number of frames in our memory store
+    @param framesPerLine: how many frames of memory to output per-line
+    @param t_memmove: the time (in milliseconds) it takes to move one frame of memory during defragmentation
+    @param metricsFile: if given, collect Metrics during the run and write them to metricsFile.json and metricsFile.csv at the end
+    @param compaction: the CompactionPolicy used to make room when a contiguous process does not fit in any hole
+    @param batchSteps: whether to process all of the events at each time step together (see runStep), showing memory and sampling metrics
+                       once per step rather than after every event
+    @param admissionQueue: whether a process that cannot be placed waits in an AdmissionQueue until a departure makes room for it (true),
+                           rather than being skipped (false)
+    @param checkpointer: if given, a Checkpointer that periodically saves the state of the run, so that it can be resumed if it dies
+    """
+    def __init__(self, specs=None, algo=MemoryAlgorithm.bestFit, contiguous=True, outputLevel=OutputLevel.full, out=None, lookahead=None,
+                 numFrames=256, framesPerLine=32, t_memmove=1, metricsFile=None, compaction=CompactionPolicy.full, batchSteps=False,
+                 admissionQueue=False, checkpointer=None):
+        self.algo = algo
+        self.contiguous = contiguous
+        self.outputLevel = outputLevel
+        self.lookahead = lookahead
+        self.numFrames = numFrames
+        self.framesPerLine = framesPerLine
+        self.t_memmove = t_memmove
+        self.metricsFile = metricsFile
+        self.compaction = compaction
+        self.batchSteps = batchSteps
+        self.useAdmissionQueue = admissionQueue
+        self.checkpointer = checkpointer
+        #all output goes through a single buffered writer, which is flushed at the end of each run
+        self.out = out if out != None else OutputWriter()
+        #text placed before every event message, so that the shards of a ShardedSimulator can tell their messages apart
+        self.logPrefix = ""
+        self.reset()
+        self.specs = specs if specs != None else []
 
-"""
-Reset the simulator, clearing all processes, and setting time back to 0
-"""
-def reset():
-    this.simTime = 0
-    this.processes = []
-    this.events = queue.PriorityQueue()
-    this.memStore = MemoryStore()
-    
-"""
-add an event with the specified time and type for the specified process to the event queue
-@param eventType: the type of event to add
-@param time: the time at which the event will occur
-@param process: the process to which the event corresponds
-"""
-def addEvent(eventType, time, process):
-    this.events.put(Event(eventType,time,process))
+    """
+    get the state to save when this simulator is pickled for a checkpoint
+    the input and output can't be saved, and are reattached (along with a checkpointer) before a restored simulator is resumed
+    """
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('specs', 'out', 'checkpointer'):
+            del state[name]
+        return state
 
-"""
-show a message indicating that the Simulator is starting up
-"""
-def showStartMessage():
-    if (this.contiguous):
-        print("time 0ms: Simulator started (Contiguous -- {0})".format("Next-Fit" if this.algo == MemoryAlgorithm.nextFit else 
-                                                            ("First-Fit" if this.algo == MemoryAlgorithm.firstFit else "Best-Fit")))
-    else:
-        print("time 0ms: Simulator started (Non-contiguous)")
-    
-"""
-show a message indicating that the Simulator has ended
-"""
-def showStopMessage():
-    if (this.contiguous):
-        print("time {0}ms: Simulator ended (Contiguous -- {1})".format(this.simTime, "Next-Fit" if this.algo == MemoryAlgorithm.nextFit else 
-                                                            ("First-Fit" if this.algo == MemoryAlgorithm.firstFit else "Best-Fit")))
-    else:
-        print("time {0}ms: Simulator ended (Non-contiguous)".format(this.simTime))
-    
-"""
-process the specified event, calling the corresponding helper method
-@param event: the event to process
-"""
-def processEvent(event):
-    #process switch in event type
-    if (event.eType == EventType.SwitchIn):
-        handleSwitchIn(event)
-    #process switch out event type
-    elif (event.eType == EventType.SwitchOut):
-        handleSwitchOut(event)
-        
-"""
-when a process switches in, display that information and add it to the Memory Store
-@param event: the event containing information about the process that just arrived
-"""
-def handleSwitchIn(event):
-    p = event.process
-    print("time {0}ms: Process {1} arrived (requires {2} frames)".format(this.simTime, p.pid, p.memSize))
-    retVal = False
-    
-    if (not this.contiguous):
-        retVal = this.memStore.addProcessPageTable(p)
-    else:
-        #call the placement function corresponding to our current contiguous memory algorithm
-        if (this.algo == MemoryAlgorithm.nextFit):
-            retVal = this.memStore.addProcessNext(p)
-        elif (this.algo == MemoryAlgorithm.firstFit):
-            retVal = this.memStore.addProcessFirst(p)
-        elif (this.algo == MemoryAlgorithm.bestFit):
-            retVal = this.memStore.addProcessBest(p)
-    
-    #show success or failure depending on whether or not we were able to place the process in memory
-    if (retVal):
-        print("time {0}ms: Placed process {1}:".format(this.simTime, p.pid))
-        #upon placing the process, add a corresponding removal event
-        addEvent(EventType.SwitchOut, this.simTime + p.arrivalRunPairs[p.pairsCompleted][1], p)
-    else:
-        print("time {0}ms: Cannot place process {1} -- skipped!".format(this.simTime, p.pid))
+    """
+    restore this simulator from a checkpoint, writing to standard output and with no input until its specs are set
+    @param state: the state saved by __getstate__
+    """
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.specs = []
+        self.out = OutputWriter()
+        self.checkpointer = None
+
+    """
+    Reset the simulator, clearing all processes, and setting time back to 0
+    """
+    def reset(self):
+        self.simTime = 0
+        #amount by which every pending event has been pushed back (event times in the queue are stored relative to this offset)
+        self.timeOffset = 0
+        self.specs = []
+        self.events = EventQueue()
+        #segregated-fit placement needs its holes binned by size rather than sorted by address
+        holeIndex = SegregatedFitIndex(self.numFrames) if (self.contiguous and self.algo == MemoryAlgorithm.segregatedFit) else None
+        self.memStore = MemoryStore(self.numFrames, self.framesPerLine, self.t_memmove, holeIndex, self.compaction)
+        self.memStore.sim = self
+        self.eventCount = 0
+        self.placedCount = 0
+        self.skippedCount = 0
+        #while a time step is being processed, memory dumps are held back until the step is complete
+        self.deferMemory = False
+        #processes waiting to be placed, and the pids of the processes currently in memory (only tracked when waiting is enabled)
+        self.admissionQueue = AdmissionQueue() if self.useAdmissionQueue else None
+        self.residentPids = set()
+        #instrumentation is only collected (and paid for) when we have somewhere to write it
+        self.metrics = Metrics() if self.metricsFile != None else None
+
+    """
+    add an event with the specified time and type for the specified process to the event queue
+    @param eventType: the type of event to add
+    @param time: the time at which the event will occur
+    @param process: the process to which the event corresponds
+    """
+    def addEvent(self, eventType, time, process):
+        self.events.put(Event(eventType,time - self.timeOffset,process))
+
+    """
+    move every arrival that could occur before (or alongside) the earliest queued event into the event queue
+    """
+    def feedArrivals(self):
+        nextArrival = self.arrivals.peekTime()
+        while (nextArrival != None and (self.events.empty() or nextArrival <= self.events.peek().time)):
+            time, proc = self.arrivals.next()
+            #arrivals are pending from time 0, so every defragmentation so far applies to them; relative to timeOffset their time is unchanged
+            self.events.put(Event(EventType.SwitchIn,time,proc))
+            nextArrival = self.arrivals.peekTime()
+
+    """
+    move time forward without processing any events, pushing back every pending event by the same amount
+    @param timeDiff: the amount of time (in milliseconds) that has elapsed
+    """
+    def shiftTime(self, timeDiff):
+        self.simTime += timeDiff
+        #shifting the offset moves every queued event at once, without touching the queue
+        self.timeOffset += timeDiff
+
+    """
+    write an event message, unless we are only reporting a summary
+    @param msg: the message to write
+    """
+    def log(self, msg):
+        if (self.outputLevel != OutputLevel.summary):
+            self.out.write(self.logPrefix + msg)
+
+    """
+    write the current contents of memory (and the page table, when non-contiguous), if we are reporting at full detail
+    """
+    def showMemory(self):
+        if (self.outputLevel == OutputLevel.full):
+            if (self.deferMemory):
+                return
+            self.out.write(str(self.memStore))
+            if (not self.contiguous):
+                self.out.write(self.memStore.formatPageTable(),end='')
+
+    """
+    get the name of the memory configuration we are simulating, as shown in the start and stop messages
+    """
+    def getConfigName(self):
+        if (not self.contiguous):
+            return "Non-contiguous"
+        return "Contiguous -- {0}".format("Next-Fit" if self.algo == MemoryAlgorithm.nextFit else
+                                          ("First-Fit" if self.algo == MemoryAlgorithm.firstFit else
+                                           ("Buddy" if self.algo == MemoryAlgorithm.buddy else
+                                            ("Segregated-Fit" if self.algo == MemoryAlgorithm.segregatedFit else "Best-Fit"))))
+
+    """
+    show a message indicating that the Simulator is starting up
+    """
+    def showStartMessage(self):
+        self.log("time 0ms: Simulator started ({0})".format(self.getConfigName()))
+
+    """
+    show a message indicating that the Simulator has ended, followed by the run's statistics if we are only reporting a summary
+    """
+    def showStopMessage(self):
+        self.out.write("time {0}ms: Simulator ended ({1})".format(self.simTime, self.getConfigName()))
+        if (self.outputLevel == OutputLevel.summary):
+            self.out.write("placed {0} processes, skipped {1}, {2} defragmentations moving {3} frames".format(
+                self.placedCount, self.skippedCount, self.memStore.defragCount, self.memStore.framesMoved))
+            if (self.contiguous and self.algo == MemoryAlgorithm.buddy):
+                self.out.write("internal fragmentation {0:.1%}".format(self.memStore.getInternalFragmentation()))
+            if (self.admissionQueue != None):
+                self.out.write("admitted {0} waiting processes (mean wait {1:.1f}ms, max wait {2}ms, max queue depth {3}), {4} gave up waiting".format(
+                    self.admissionQueue.admittedCount, self.admissionQueue.getMeanWait(), self.admissionQueue.maxWait,
+                    self.admissionQueue.maxDepth, self.admissionQueue.expiredCount))
+                self.out.write("throughput {0:.2f} placements/s".format(self.placedCount * 1000 / self.simTime if self.simTime > 0 else 0.0))
+        self.out.flush()
+
+    """
+    process the specified event, calling the corresponding helper method
+    @param event: the event to process
+    """
+    def processEvent(self, event):
+        #process switch in event type
+        if (event.eType == EventType.SwitchIn):
+            self.handleSwitchIn(event)
+        #process switch out event type
+        elif (event.eType == EventType.SwitchOut):
+            self.handleSwitchOut(event)
+
+    """
+    get the number of processes waiting to be placed
+    """
+    def getQueueDepth(self):
+        return len(self.admissionQueue) if self.admissionQueue != None else 0
+
+    """
+    try to place a process in memory using the placement function corresponding to our memory configuration
+    @param p: the process to place
+    @returns whether the process was placed (true) or not (false)
+    """
+    def placeProcess(self, p):
+        if (not self.contiguous):
+            place = self.memStore.addProcessPageTable
+        else:
+            #call the placement function corresponding to our current contiguous memory algorithm
+            if (self.algo == MemoryAlgorithm.nextFit):
+                place = self.memStore.addProcessNext
+            elif (self.algo == MemoryAlgorithm.firstFit):
+                place = self.memStore.addProcessFirst
+            elif (self.algo == MemoryAlgorithm.bestFit):
+                place = self.memStore.addProcessBest
+            elif (self.algo == MemoryAlgorithm.buddy):
+                place = self.memStore.addProcessBuddy
+            elif (self.algo == MemoryAlgorithm.segregatedFit):
+                place = self.memStore.addProcessSegregated
+
+        if (self.metrics != None):
+            startTime = time.perf_counter()
+            retVal = place(p)
+            self.metrics.recordPlacement(place.__name__, time.perf_counter() - startTime, retVal)
+            return retVal
+        return place(p)
+
+    """
+    account for a process that has just been placed in memory, adding a corresponding removal event
+    @param p: the process that was placed
+    @param pairIndex: the index of the arrival/run pair the process is now running
+    """
+    def startRunning(self, p, pairIndex):
+        self.placedCount += 1
+        if (self.admissionQueue != None):
+            #pairs skipped or given up on while the process was out of memory count as completed
+            p.pairsCompleted = pairIndex
+            self.residentPids.add(p.pid)
+        self.addEvent(EventType.SwitchOut, self.simTime + p.arrivalRunPairs[pairIndex][1], p)
+
+    """
+    when a process switches in, display that information and add it to the Memory Store
+    @param event: the event containing information about the process that just arrived
+    """
+    def handleSwitchIn(self, event):
+        p = event.process
+        pairIndex = p.pairsArrived
+        p.pairsArrived += 1
+        self.log("time {0}ms: Process {1} arrived (requires {2} frames)".format(self.simTime, p.pid, p.memSize))
+
+        if (self.admissionQueue != None):
+            #a process still running an earlier pair cannot start another, and one still waiting for an earlier pair gives up on it
+            if (p.pid in self.residentPids):
+                self.log("time {0}ms: Process {1} is still in memory -- skipped!".format(self.simTime, p.pid))
+                self.skippedCount += 1
+                self.showMemory()
+                return
+            if (p.pid in self.admissionQueue):
+                self.expireWaiting(p.pid)
+        else:
+            pairIndex = p.pairsCompleted
+
+        #show success or failure depending on whether or not we were able to place the process in memory
+        if (self.placeProcess(p)):
+            self.log("time {0}ms: Placed process {1}:".format(self.simTime, p.pid))
+            self.startRunning(p, pairIndex)
+        elif (self.admissionQueue != None):
+            self.log("time {0}ms: Cannot place process {1} -- waiting".format(self.simTime, p.pid))
+            self.admissionQueue.add(p, pairIndex, self.simTime)
+        else:
+            self.log("time {0}ms: Cannot place process {1} -- skipped!".format(self.simTime, p.pid))
+            self.skippedCount += 1
+            p.pairsCompleted += 1
+        self.showMemory()
+
+    """
+    when a process switches out, display that information and remove it from the Memory Store
+    @param event: the event containing information about the process that just left
+    """
+    def handleSwitchOut(self, event):
+        p = event.process
+        self.log("time {0}ms: Process {1} removed:".format(self.simTime, p.pid))
+        self.memStore.removeProcess(p)
+        self.showMemory()
         p.pairsCompleted += 1
-    print(this.memStore)
-    if (not this.contiguous):
-        this.memStore.displayPageTable()
+        if (self.admissionQueue != None):
+            self.residentPids.discard(p.pid)
+            self.admitWaiting()
 
-"""
-when a process switches out, display that information and remove it from the Memory Store
-@param event: the event containing information about the process that just left
-"""
-def handleSwitchOut(event):
-    p = event.process
-    print("time {0}ms: Process {1} removed:".format(this.simTime, p.pid))
-    this.memStore.removeProcess(p)
-    print(this.memStore)
-    if (not this.contiguous):
-        this.memStore.displayPageTable()
-    p.pairsCompleted += 1
+    """
+    get an upper bound on the size of process that could be placed right now without defragmenting
+    """
+    def getAdmissionLimit(self):
+        #a contiguous process needs a single hole big enough for it (and a buddy block lies within a hole), while pages may go anywhere
+        return self.memStore.getLargestFreeBlock() if self.contiguous else self.memStore.getFreeMemory()
 
-"""
-run the simulation
-"""
-def run():
-    this.showStartMessage()
-    
-    #populate the event queue with all arrival events for all processes
-    for p in this.processes:
-        for i in range(len(p.arrivalRunPairs)):
-            addEvent(EventType.SwitchIn,p.arrivalRunPairs[i][0], p)
-        
-    #jump from event to event
-    while(not this.events.empty()):
-        #get the current event and update time
-        currEvent = this.events.get()
-        this.simTime = currEvent.time
-        
-        #process the current event
-        this.processEvent(currEvent)
-    
-    this.showStopMessage()
\ No newline at end of file
+    """
+    place as many waiting processes as will now fit, in the order they started waiting
+    waiting processes are only placed into holes that are already big enough for them, so that a departure never triggers a defragmentation
+    """
+    def admitWaiting(self):
+        #most departures cannot make room for even the smallest waiting process, so check that before looking through the queue
+        limit = self.getAdmissionLimit()
+        smallest = self.admissionQueue.getSmallestSize()
+        if (smallest == None or smallest > limit):
+            return
+        for p, pairIndex, waitStart in self.admissionQueue.getCandidates(limit):
+            #earlier placements shrink the holes, so recheck each candidate against the current limit before trying to place it
+            if (p.memSize > limit or not self.placeProcess(p)):
+                continue
+            waitTime = self.admissionQueue.admit(p.pid, self.simTime)
+            if (self.metrics != None):
+                self.metrics.recordAdmission(waitTime)
+            self.log("time {0}ms: Placed process {1} after waiting {2}ms:".format(self.simTime, p.pid, waitTime))
+            self.startRunning(p, pairIndex)
+            self.showMemory()
+            limit = self.getAdmissionLimit()
+            smallest = self.admissionQueue.getSmallestSize()
+            if (smallest == None or smallest > limit):
+                return
+
+    """
+    give up on placing a waiting process, counting its pair as skipped
+    @param pid: the pid of the waiting process
+    """
+    def expireWaiting(self, pid):
+        self.admissionQueue.expire(pid)
+        if (self.metrics != None):
+            self.metrics.recordExpiry()
+        self.log("time {0}ms: Process {1} gave up waiting -- skipped!".format(self.simTime, pid))
+        self.skippedCount += 1
+
+    """
+    process every event at the time of the earliest queued event, in the usual priority order (including any events queued for that same
+    time along the way), then show memory and sample metrics once for the whole step
+    """
+    def runStep(self):
+        #event times are stored relative to timeOffset, so the step's stored time stays put even if a defragmentation pushes simTime back
+        stepTime = self.events.peek().time
+        changeCount = self.memStore.changeCount
+        self.deferMemory = True
+        while (not self.events.empty() and self.events.peek().time == stepTime):
+            currEvent = self.events.get()
+            self.simTime = currEvent.time + self.timeOffset
+            self.processEvent(currEvent)
+            self.eventCount += 1
+        self.deferMemory = False
+
+        #memory is only shown if some event in the step changed it (a step of skipped arrivals shows nothing)
+        if (self.memStore.changeCount != changeCount):
+            self.showMemory()
+        if (self.metrics != None):
+            self.metrics.sample(self.simTime, currEvent, self.memStore, self.getQueueDepth())
+        #every arrival at this step's time was already queued before the step began, so arrivals only need topping up once per step
+        self.feedArrivals()
+
+    """
+    run the simulation
+    """
+    def run(self):
+        self.showStartMessage()
+
+        #arrival events are fed into the event queue lazily, just before they are needed
+        #each spec gets its own Process record for this run, created only once the spec is read
+        self.arrivals = ArrivalSource((Process(spec) for spec in self.specs), self.lookahead)
+        self.feedArrivals()
+
+        self.runEvents()
+
+    """
+    continue a simulation restored from a checkpoint (see loadCheckpoint), producing exactly the output an uninterrupted run would from there on
+    """
+    def resume(self):
+        #processes taken from the input before the checkpoint are read again, so that the arrivals still to come are the same as before
+        self.arrivals.resumeFrom(Process(spec) for spec in self.specs)
+        self.runEvents()
+
+    """
+    process events until none are left, then finish the run
+    """
+    def runEvents(self):
+        #jump from event to event (or from time step to time step)
+        while(not self.events.empty()):
+            if (self.batchSteps):
+                self.runStep()
+            else:
+                #get the current event and update time
+                currEvent = self.events.get()
+                self.simTime = currEvent.time + self.timeOffset
+
+                #process the current event
+                self.processEvent(currEvent)
+                self.eventCount += 1
+                if (self.metrics != None):
+                    self.metrics.sample(self.simTime, currEvent, self.memStore, self.getQueueDepth())
+                self.feedArrivals()
+            if (self.checkpointer != None):
+                self.checkpointer.maybeSave(self)
+
+        #nothing is left to free memory, so any process still waiting will never be placed
+        if (self.admissionQueue != None):
+            for pid in list(self.admissionQueue.waiting):
+                self.expireWaiting(pid)
+
+        self.showStopMessage()
+        if (self.metricsFile != None):
+            self.metrics.export(self.metricsFile + ".json", self.metricsFile + ".csv")
+        if (self.checkpointer != None):
+            self.checkpointer.finish(self)
@@ -0,0 +1,99 @@
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+from MemoryStore import MemoryAlgorithm, CompactionPolicy
+from Metrics import Metrics
+from Output import OutputLevel, OutputWriter
+from Simulator import Simulator
+from TraceGenerator import TraceGenerator
+
+#the memory configurations we benchmark: (name, contiguous algorithm, contiguous)
+CONFIGURATIONS = [("next-fit", MemoryAlgorithm.nextFit, True), ("first-fit", MemoryAlgorithm.firstFit, True),
+                  ("best-fit", MemoryAlgorithm.bestFit, True), ("buddy", MemoryAlgorithm.buddy, True),
+                  ("segregated-fit", MemoryAlgorithm.segregatedFit, True), ("non-contiguous", None, False)]
+
+"""
+build a trace whose process sizes are scaled to the size of memory, so that every memory size sees a similar amount of contention
+@param numFrames: the number of frames in the memory being benchmarked
+@param numProcesses: the number of processes in the trace
+@param seed: the seed for the trace generator
+@returns a list of ProcessSpecs
+"""
+def makeTrace(numFrames, numProcesses, seed):
+    #sizes average 1/32 of memory and dozens of processes are live at once, so memory stays under pressure and fragments over time
+    return list(TraceGenerator(seed, numProcesses, 1, max(2, numFrames // 16), 'uniform', 0.06, 400).generateSpecs())
+
+"""
+time a single simulation run
+@param specs: the ProcessSpecs to simulate
+@param algo: the MemoryAlgorithm to use for contiguous placement
+@param contiguous: whether memory is allocated contiguously (true) or through a page table (false)
+@param numFrames: the number of frames in memory
+@param latency: whether to also time every placement call (which slows the run down, so throughput is not comparable with runs without it)
+@param compaction: the CompactionPolicy used when a contiguous process does not fit in any hole
+@returns a dict of measurements for the run
+"""
+def benchmarkRun(specs, algo, contiguous, numFrames, latency=False, compaction=CompactionPolicy.full):
+    sim = Simulator(specs, algo, contiguous, OutputLevel.summary, OutputWriter(io.StringIO()), numFrames=numFrames, compaction=compaction)
+    if (latency):
+        #collect metrics without writing them anywhere; we only read back the placement latencies
+        sim.metrics = Metrics()
+    start = time.perf_counter()
+    sim.run()
+    elapsed = time.perf_counter() - start
+    result = {"seconds": elapsed, "events": sim.eventCount, "eventsPerSec": sim.eventCount / elapsed,
+              "placements": sim.placedCount, "placementsPerSec": sim.placedCount / elapsed, "skipped": sim.skippedCount,
+              "defragmentations": sim.memStore.defragCount, "framesMoved": sim.memStore.framesMoved, "endTime": sim.simTime,
+              "internalFragmentation": sim.memStore.getInternalFragmentation()}
+    if (latency):
+        #every configuration uses exactly one placement method
+        result["placementLatency"] = sim.metrics.summarizeLatencies(
+            [seconds for latencies in sim.metrics.placementLatency.values() for seconds in latencies])
+    return result
+
+"""
+main method: benchmark every configuration across a range of memory sizes, printing a table and writing the results as JSON
+"""
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulator's allocators across memory sizes")
+    parser.add_argument("--frames", type=int, nargs='+', default=[256, 4096, 65536, 1048576, 10485760],
+                        help="the memory sizes (numFrames) to benchmark")
+    parser.add_argument("--processes", type=int, default=2000, help="number of processes in each generated trace")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--configs", nargs='+', choices=[c[0] for c in CONFIGURATIONS], default=[c[0] for c in CONFIGURATIONS],
+                        help="the configurations to benchmark")
+    parser.add_argument("--latency", action="store_true",
+                        help="also report the median and 99th percentile latency of placement calls (slows every run down)")
+    parser.add_argument("--compaction", choices=[policy.name for policy in CompactionPolicy], default=CompactionPolicy.full.name,
+                        help="the compaction policy used by the contiguous configurations")
+    parser.add_argument("--results", default="benchmark_results.json", help="the file to write machine-readable results to")
+    args = parser.parse_args()
+
+    results = []
+    print("{0:>10} {1:>15} {2:>10} {3:>14} {4:>18} {5:>8} {6:>8} {7:>9}".format(
+        "numFrames", "config", "seconds", "events/sec", "placements/sec", "skipped", "defrags", "int.frag") +
+        (" {0:>12} {1:>12}".format("p50 place us", "p99 place us") if args.latency else ""))
+    for numFrames in args.frames:
+        specs = makeTrace(numFrames, args.processes, args.seed)
+        for name, algo, contiguous in CONFIGURATIONS:
+            if (name not in args.configs):
+                continue
+            result = benchmarkRun(specs, algo, contiguous, numFrames, args.latency, CompactionPolicy[args.compaction])
+            result.update({"numFrames": numFrames, "config": name, "processes": args.processes, "seed": args.seed,
+                           "compaction": args.compaction})
+            results.append(result)
+            print("{0:>10} {1:>15} {2:>10.3f} {3:>14,.0f} {4:>18,.0f} {5:>8} {6:>8} {7:>9.1%}".format(
+                numFrames, name, result["seconds"], result["eventsPerSec"], result["placementsPerSec"], result["skipped"],
+                result["defragmentations"], result["internalFragmentation"]) +
+                (" {0:>12.2f} {1:>12.2f}".format(result["placementLatency"]["p50"]*1e6, result["placementLatency"]["p99"]*1e6)
+                 if args.latency else ""))
+            sys.stdout.flush()
+
+    with open(args.results, 'w') as f:
+        json.dump({"python": platform.python_version(), "platform": platform.platform(), "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import argparse
+import concurrent.futures
+import hashlib
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from MemoryStore import MemoryAlgorithm, CompactionPolicy
+from Output import OutputLevel, OutputWriter
+from Simulator import Simulator
+from Process import InputFormatError
+from project2 import iterTrace
+
+#name used for non-contiguous memory alongside the contiguous MemoryAlgorithms
+NON_CONTIGUOUS = "nonContiguous"
+
+#bump this whenever a change to the simulator would change the summary of a run, so that stale cache entries are ignored
+CACHE_VERSION = 2
+
+"""
+hash the contents of a trace file, so that cache entries follow the trace rather than its file name
+@param fileName: the trace file to hash
+@returns the hex digest of the file's contents
+"""
+def hashTrace(fileName):
+    digest = hashlib.sha256()
+    with open(fileName, 'rb') as f:
+        for chunk in iter(lambda: f.read(1<<20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+"""
+get the cache key for a single run
+@param traceHash: the hash of the trace's contents
+@param config: the run's configuration, as a dict of simple values
+@returns the hex digest identifying the run
+"""
+def getCacheKey(traceHash, config):
+    return hashlib.sha256(json.dumps([CACHE_VERSION, traceHash, config], sort_keys=True).encode()).hexdigest()
+
+"""
+simulate a single cell of the sweep (used by worker processes)
+@param traceFile: the name of the trace file to simulate
+@param config: the run's configuration: algorithm name, numFrames, t_memmove and compaction policy name
+@returns a dict summarizing the run
+"""
+def runCell(traceFile, config):
+    contiguous = config["algo"] != NON_CONTIGUOUS
+    algo = MemoryAlgorithm[config["algo"]] if contiguous else None
+    sim = Simulator(list(iterTrace(traceFile)), algo, contiguous, OutputLevel.summary, OutputWriter(io.StringIO()),
+                    numFrames=config["numFrames"], t_memmove=config["t_memmove"], compaction=CompactionPolicy[config["compaction"]])
+    start = time.perf_counter()
+    sim.run()
+    return {"endTime": sim.simTime, "events": sim.eventCount, "placed": sim.placedCount, "skipped": sim.skippedCount,
+            "defragmentations": sim.memStore.defragCount, "framesMoved": sim.memStore.framesMoved,
+            "internalFragmentation": sim.memStore.getInternalFragmentation(),
+            "seconds": time.perf_counter() - start}
+
+"""
+The Sweep class runs every combination of trace, algorithm, memory size and move cost, caching each run's summary on disk
+"""
+class Sweep():
+    """
+    Sweep constructor: creates a new sweep over the specified grid
+    @param traces: the trace files to simulate
+    @param algos: the algorithm names to simulate (MemoryAlgorithm names, or NON_CONTIGUOUS)
+    @param frames: the memory sizes (numFrames) to simulate
+    @param memmoves: the values of t_memmove to simulate
+    @param compactions: the CompactionPolicy names to simulate
+    @param cacheDir: the directory in which run summaries are cached
+    """
+    def __init__(self, traces, algos, frames, memmoves, compactions, cacheDir):
+        self.traces = traces
+        self.algos = algos
+        self.frames = frames
+        self.memmoves = memmoves
+        self.compactions = compactions
+        self.cacheDir = cacheDir
+
+    """
+    get every cell of the grid
+    @returns a list of (trace file, config) pairs
+    """
+    def getCells(self):
+        return [(trace, {"algo": algo, "numFrames": numFrames, "t_memmove": memmove, "compaction": compaction})
+                for trace, algo, numFrames, memmove, compaction in itertools.product(self.traces, self.algos, self.frames, self.memmoves,
+                                                                                     self.compactions)]
+
+    """
+    get the path of the cache entry for a run
+    @param key: the run's cache key
+    """
+    def getCachePath(self, key):
+        return os.path.join(self.cacheDir, key + ".json")
+
+    """
+    run the sweep, simulating only the cells that are not already cached
+    @param jobs: the number of worker processes to use
+    @returns a list of result dicts (the cell's trace and config, plus its summary), in grid order, and the number of cells computed
+    """
+    def run(self, jobs):
+        os.makedirs(self.cacheDir, exist_ok=True)
+        traceHashes = {trace: hashTrace(trace) for trace in self.traces}
+        results = []
+        missing = []
+        for trace, config in self.getCells():
+            key = getCacheKey(traceHashes[trace], config)
+            result = dict(config, trace=trace)
+            if (os.path.exists(self.getCachePath(key))):
+                with open(self.getCachePath(key)) as f:
+                    result["summary"] = json.load(f)
+            else:
+                missing.append((key, trace, config, result))
+            results.append(result)
+
+        #spread the missing cells across the pool, caching each summary as soon as it arrives
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(runCell, trace, config): (key, result) for key, trace, config, result in missing}
+            for future in concurrent.futures.as_completed(futures):
+                key, result = futures[future]
+                result["summary"] = future.result()
+                #write to a temporary file first, so that an interrupted sweep never leaves a truncated cache entry
+                tempPath = self.getCachePath(key) + ".tmp"
+                with open(tempPath, 'w') as f:
+                    json.dump(result["summary"], f)
+                os.replace(tempPath, self.getCachePath(key))
+        return results, len(missing)
+
+"""
+main method: run the sweep described on the command line and report its results
+"""
+def main():
+    allAlgos = [algo.name for algo in MemoryAlgorithm] + [NON_CONTIGUOUS]
+    parser = argparse.ArgumentParser(description="Sweep traces x algorithms x memory sizes x move costs x compaction policies, caching every run")
+    parser.add_argument("traces", nargs='+', help="the trace files to simulate")
+    parser.add_argument("--algos", nargs='+', choices=allAlgos, default=allAlgos)
+    parser.add_argument("--frames", type=int, nargs='+', default=[256], help="the memory sizes (numFrames) to simulate")
+    parser.add_argument("--memmove", type=int, nargs='+', default=[1], help="the values of t_memmove to simulate")
+    parser.add_argument("--compaction", nargs='+', choices=[policy.name for policy in CompactionPolicy],
+                        default=[CompactionPolicy.full.name], help="the compaction policies to simulate")
+    parser.add_argument("--cache-dir", default=".sweep_cache", help="the directory in which run summaries are cached")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="the number of worker processes")
+    parser.add_argument("--results", help="also write every result to this JSON file")
+    args = parser.parse_args()
+
+    try:
+        results, computed = Sweep(args.traces, args.algos, args.frames, args.memmove, args.compaction, args.cache_dir).run(args.jobs)
+    #the traces are also read directly, to hash them for the cache
+    except (IOError, InputFormatError):
+        print("Error: Invalid input file format", file=sys.stderr)
+        sys.exit(1)
+    print("{0:>30} {1:>15} {2:>10} {3:>8} {4:>10} {5:>10} {6:>8} {7:>8} {8:>8} {9:>8}".format(
+        "trace", "algo", "numFrames", "memmove", "compaction", "endTime", "placed", "skipped", "defrags", "moved"))
+    for r in results:
+        s = r["summary"]
+        print("{0:>30} {1:>15} {2:>10} {3:>8} {4:>10} {5:>10} {6:>8} {7:>8} {8:>8} {9:>8}".format(
+            os.path.basename(r["trace"])[-30:], r["algo"], r["numFrames"], r["t_memmove"], r["compaction"], s["endTime"], s["placed"],
+            s["skipped"], s["defragmentations"], s["framesMoved"]))
+    print("{0} of {1} runs computed, {2} taken from the cache".format(computed, len(results), len(results) - computed))
+    if (args.results != None):
+        with open(args.results, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import random
+import string
+from Process import ProcessSpec
+
+#characters used for pids; traces with more processes than this get multi-character pids (memory dumps show their first character)
+PID_CHARS = string.ascii_uppercase + string.ascii_lowercase
+
+"""
+The TraceGenerator class produces seeded, synthetic process traces in the same format as our input files
+"""
+class TraceGenerator():
+    """
+    TraceGenerator constructor: creates a new generator with the specified workload shape
+    @param seed: the seed for the random number generator; the same seed and settings always produce the same trace
+    @param numProcesses: the number of processes in the trace
+    @param minSize: the smallest number of frames a process may require
+    @param maxSize: the largest number of frames a process may require
+    @param sizeDist: how process sizes are drawn: 'uniform' between minSize and maxSize, 'exponential' (mostly small, mean a quarter
+                     of the range), or 'bimodal' (a mix of processes near minSize and near maxSize)
+    @param arrivalRate: the mean number of new processes arriving per millisecond (arrivals follow a Poisson process)
+    @param meanRunTime: the mean run time of each arrival, in milliseconds
+    @param runDist: how run times are drawn: 'exponential' or 'uniform' (between 1 and twice the mean)
+    @param maxPairs: each process arrives between 1 and maxPairs times
+    """
+    def __init__(self, seed=0, numProcesses=1000, minSize=1, maxSize=64, sizeDist='uniform', arrivalRate=0.1, meanRunTime=500,
+                 runDist='exponential', maxPairs=3):
+        self.rng = random.Random(seed)
+        self.numProcesses = numProcesses
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.sizeDist = sizeDist
+        self.arrivalRate = arrivalRate
+        self.meanRunTime = meanRunTime
+        self.runDist = runDist
+        self.maxPairs = maxPairs
+
+    """
+    get the pid for the specified process number, unique within a trace
+    @param i: the index of the process within the trace
+    """
+    def getPid(self, i):
+        if (self.numProcesses <= len(PID_CHARS)):
+            return PID_CHARS[i]
+        return PID_CHARS[i % len(PID_CHARS)] + str(i // len(PID_CHARS))
+
+    """
+    draw a process size from the configured distribution
+    """
+    def drawSize(self):
+        if (self.sizeDist == 'exponential'):
+            size = self.minSize + int(self.rng.expovariate(4.0 / max(1, self.maxSize - self.minSize)))
+        elif (self.sizeDist == 'bimodal'):
+            spread = max(1, (self.maxSize - self.minSize) // 8)
+            size = (self.minSize + self.rng.randint(0, spread)) if self.rng.random() < 0.5 else (self.maxSize - self.rng.randint(0, spread))
+        else:
+            size = self.rng.randint(self.minSize, self.maxSize)
+        return min(max(size, self.minSize), self.maxSize)
+
+    """
+    draw a run time from the configured distribution
+    """
+    def drawRunTime(self):
+        if (self.runDist == 'uniform'):
+            return self.rng.randint(1, 2*self.meanRunTime)
+        return max(1, int(self.rng.expovariate(1.0 / self.meanRunTime)))
+
+    """
+    generate the trace, one process at a time, in order of first arrival time
+    @returns a generator of (pid, memSize, [(arrival time, run time)]) tuples
+    """
+    def generate(self):
+        time = 0.0
+        for i in range(self.numProcesses):
+            time += self.rng.expovariate(self.arrivalRate)
+            arrival = int(time)
+            pairs = []
+            for j in range(self.rng.randint(1, self.maxPairs)):
+                runTime = self.drawRunTime()
+                pairs.append((arrival, runTime))
+                #the next arrival of this process comes some time after this one has finished running
+                arrival += runTime + 1 + int(self.rng.expovariate(self.arrivalRate / 4))
+            yield (self.getPid(i), self.drawSize(), pairs)
+
+    """
+    generate the trace as ProcessSpecs, ready to be handed to a Simulator
+    @returns a generator of ProcessSpecs
+    """
+    def generateSpecs(self):
+        for pid, memSize, pairs in self.generate():
+            yield ProcessSpec(pid, str(memSize), ["{0}/{1}".format(a, r) for a, r in pairs])
+
+    """
+    write the trace to a file in our input format
+    @param fileName: the name of the file to write
+    """
+    def write(self, fileName):
+        with open(fileName, 'w') as f:
+            for pid, memSize, pairs in self.generate():
+                f.write("{0} {1} {2}\n".format(pid, memSize, ' '.join("{0}/{1}".format(a, r) for a, r in pairs)))
+
+"""
+main method: generate a trace with the options given on the command line and write it to a file
+"""
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic process trace")
+    parser.add_argument("outputFile", help="the file to write the trace to")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=1000, help="number of processes in the trace")
+    parser.add_argument("--min-size", type=int, default=1, help="smallest process size, in frames")
+    parser.add_argument("--max-size", type=int, default=64, help="largest process size, in frames")
+    parser.add_argument("--size-dist", choices=['uniform', 'exponential', 'bimodal'], default='uniform')
+    parser.add_argument("--arrival-rate", type=float, default=0.1, help="mean number of new processes arriving per millisecond")
+    parser.add_argument("--run-time", type=int, default=500, help="mean run time per arrival, in milliseconds")
+    parser.add_argument("--run-dist", choices=['exponential', 'uniform'], default='exponential')
+    parser.add_argument("--max-pairs", type=int, default=3, help="largest number of arrivals per process")
+    args = parser.parse_args()
+    TraceGenerator(args.seed, args.processes, args.min_size, args.max_size, args.size_dist, args.arrival_rate, args.run_time,
+                   args.run_dist, args.max_pairs).write(args.outputFile)
+
+if __name__ == "__main__":
+    main()
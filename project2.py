@@ -1,8 +1,24 @@
-import copy
+import argparse
+import concurrent.futures
+import io
+import os
+import pickle
 import sys
-from Process import Process
-import Simulator
-from MemoryStore import MemoryAlgorithm
+from Process import ProcessSpec, InputFormatError
+from ArrivalSource import ArrivalOrderError
+from BinaryTrace import isBinaryTrace, BinaryTraceReader
+from Simulator import Simulator
+from ShardedSimulator import ShardedSimulator, RoutingPolicy
+from Checkpoint import Checkpointer, loadCheckpoint
+from MemoryStore import MemoryAlgorithm, CompactionPolicy
+from Output import OutputLevel, OutputWriter
+
+#the memory configurations we simulate by default, in the order their output is shown: (contiguous algorithm, contiguous)
+CONFIGURATIONS = [(MemoryAlgorithm.nextFit, True), (MemoryAlgorithm.firstFit, True), (MemoryAlgorithm.bestFit, True), (None, False)]
+
+#every configuration that can be selected with --configs, by name
+ALL_CONFIGURATIONS = {algo.name: (algo, True) for algo in MemoryAlgorithm}
+ALL_CONFIGURATIONS["nonContiguous"] = (None, False)
     
 """
 display a message on standard error and exit the program
@@ -13,24 +29,194 @@ def exitError(msg):
     sys.exit(1)
     
 """
-read the process info from the specified input file
+lazily read the process info from the specified input file, one process at a time
 @param fileName: the name of the file containing our process info
-@returns a list of processes corresponding to the data in the input file
+@returns a generator of ProcessSpecs corresponding to the data in the input file (raises InputFormatError if the file cannot be read or parsed)
 """
-def readInput(fileName):
-    processes = []
+def iterInput(fileName):
     try:
+        f = open(fileName)
+    except IOError as e:
+        raise InputFormatError("cannot open {0}: {1}".format(fileName, e))
+    with f:
         #read the file line by line, ignoring lines that start with a # or lines that are entirely whitespace
-        for line in (l for l in open(fileName) if l[0] != '#' and l.strip() != ""):
-            #make sure the input line contains at least 3 elements (type-checking and validity will be handled in Process constructor) 
+        for line in (l for l in f if l[0] != '#' and l.strip() != ""):
+            #make sure the input line contains at least 3 elements (type-checking and validity will be handled in ProcessSpec constructor) 
             splitLine = line.strip().split(' ')
             if (len(splitLine) < 3):
-                raise TypeError()
-            processes.append(Process(splitLine[0],splitLine[1],splitLine[2:]))
-    except (IOError, TypeError):
+                raise InputFormatError("expected a pid, a size and arrival/run pairs, got '{0}'".format(line.strip()))
+            yield ProcessSpec(splitLine[0],splitLine[1],splitLine[2:])
+
+"""
+lazily read the process info from the specified trace, which may be a text input file or a binary trace (see BinaryTrace)
+@param fileName: the name of the file containing our process info
+@returns an iterator of ProcessSpecs corresponding to the data in the trace (raises InputFormatError if the trace cannot be read or parsed)
+"""
+def iterTrace(fileName):
+    try:
+        binary = isBinaryTrace(fileName)
+    except IOError as e:
+        raise InputFormatError("cannot open {0}: {1}".format(fileName, e))
+    if (binary):
+        return iter(BinaryTraceReader(fileName))
+    return iterInput(fileName)
+
+"""
+read the process info from the specified input file
+@param fileName: the name of the file containing our process info
+@returns a list of ProcessSpecs corresponding to the data in the input file
+"""
+def readInput(fileName):
+    specs = []
+    try:
+        specs = list(iterTrace(fileName))
+    except InputFormatError:
         exitError("Invalid input file format")
-    return processes
+    return specs
+  
+"""
+parse the command line arguments
+@returns a namespace containing the input file name and the selected run options
+"""
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Simulate contiguous and non-contiguous memory allocation")
+    parser.add_argument("inputFile", help="the file containing our process info (a text input file or a binary trace)")
+    parser.add_argument("--output", choices=[level.name for level in OutputLevel], default=OutputLevel.full.name,
+                        help="full: events and memory dumps (default); events: events only; summary: final statistics only")
+    parser.add_argument("--configs", nargs='+', choices=list(ALL_CONFIGURATIONS),
+                        default=[algo.name if contiguous else "nonContiguous" for algo, contiguous in CONFIGURATIONS],
+                        help="the memory configurations to simulate, in order (default: nextFit firstFit bestFit nonContiguous)")
+    parser.add_argument("--jobs", type=int, default=min(len(CONFIGURATIONS), os.cpu_count() or 1),
+                        help="number of configurations to simulate at once in separate processes (1 runs them one after another)")
+    parser.add_argument("--stream", action="store_true",
+                        help="read the input lazily during each run instead of loading it up front (the input must be sorted by first arrival time, "
+                             "unless --lookahead is given)")
+    parser.add_argument("--lookahead", type=int, default=1,
+                        help="when streaming, how many processes to read ahead so that slightly out-of-order input can still be merged")
+    parser.add_argument("--frames", type=int, default=256, help="number of frames of memory (default 256)")
+    parser.add_argument("--frames-per-line", type=int, default=32, help="number of frames shown per line of a memory dump (default 32)")
+    parser.add_argument("--memmove", type=int, default=1,
+                        help="time (in milliseconds) to move one frame of memory during defragmentation (default 1)")
+    parser.add_argument("--compaction", choices=[policy.name for policy in CompactionPolicy], default=CompactionPolicy.full.name,
+                        help="full: slide every process down when a process does not fit (default); partial: move only the processes in the "
+                             "cheapest region that can be cleared")
+    parser.add_argument("--batch-steps", action="store_true",
+                        help="process all of the events at each millisecond together, showing memory once per millisecond instead of after "
+                             "every event")
+    parser.add_argument("--admission-queue", action="store_true",
+                        help="make processes that cannot be placed wait until a departure frees enough memory for them, instead of skipping them")
+    parser.add_argument("--shards", nargs='+', metavar="CONFIG[:FRAMES]",
+                        help="simulate a fleet of memory stores instead of each configuration in turn, one shard per CONFIG (any --configs name), "
+                             "each with FRAMES frames (default --frames)")
+    parser.add_argument("--routing", choices=[policy.name for policy in RoutingPolicy], default=RoutingPolicy.leastLoaded.name,
+                        help="with --shards, how arrivals are assigned to shards (default leastLoaded)")
+    parser.add_argument("--checkpoint", metavar="FILE",
+                        help="periodically save the state of the run to FILE, so that it can be continued with --resume if it dies "
+                             "(configurations are then run one after another)")
+    parser.add_argument("--checkpoint-every", type=int, default=10000, metavar="EVENTS",
+                        help="with --checkpoint, the number of events to process between checkpoints (default 10000)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the run saved in the --checkpoint file, given the same input file and options as the run that made it")
+    parser.add_argument("--metrics", metavar="PREFIX",
+                        help="record per-event metrics, written to PREFIX-<configuration>.json (summary) and .csv (time series)")
+    args = parser.parse_args()
+    args.configurations = [ALL_CONFIGURATIONS[name] for name in args.configs]
+    if (args.frames < 1 or args.frames_per_line < 1 or args.memmove < 0):
+        exitError("--frames and --frames-per-line must be positive, and --memmove must not be negative")
+    args.shardConfigurations = None
+    if (args.shards != None):
+        if (args.batch_steps or args.admission_queue):
+            exitError("--shards cannot be combined with --batch-steps or --admission-queue")
+        args.shardConfigurations = [parseShard(shard, args.frames) for shard in args.shards]
+    if (args.checkpoint != None):
+        if (args.shards != None or args.checkpoint_every < 1):
+            exitError("--checkpoint cannot be combined with --shards, and --checkpoint-every must be positive")
+        #every configuration is checkpointed to the same file, so they have to run one at a time
+        args.jobs = 1
+    elif (args.resume):
+        exitError("--resume requires the --checkpoint file to resume from")
+    return args
+
+"""
+parse the configuration of a single shard given to --shards
+@param shard: the shard's configuration, as CONFIG or CONFIG:FRAMES
+@param defaultFrames: the number of frames to use when none are given
+@returns the (MemoryAlgorithm, contiguous, numFrames) of the shard
+"""
+def parseShard(shard, defaultFrames):
+    name, sep, frames = shard.partition(':')
+    if (name not in ALL_CONFIGURATIONS or (sep and not (frames.isdigit() and int(frames) > 0))):
+        exitError("invalid shard '{0}': expected one of {1}, optionally followed by :FRAMES".format(shard, ', '.join(ALL_CONFIGURATIONS)))
+    algo, contiguous = ALL_CONFIGURATIONS[name]
+    return (algo, contiguous, int(frames) if sep else defaultFrames)
+
+"""
+create a simulator for a single memory configuration, using the run options from the command line
+@param specs: the ProcessSpecs to simulate (a list, or a generator when streaming)
+@param algo: the MemoryAlgorithm to use for contiguous placement
+@param contiguous: whether memory is allocated contiguously (true) or through a page table (false)
+@param args: the parsed command line arguments
+@param out: the OutputWriter to write to (defaults to standard output)
+@param checkpointer: the Checkpointer saving the run, if any
+@returns the new Simulator
+"""
+def makeSimulator(specs, algo, contiguous, args, out=None, checkpointer=None):
+    metricsFile = None
+    if (args.metrics != None):
+        metricsFile = "{0}-{1}".format(args.metrics, algo.name if contiguous else "nonContiguous")
+    return Simulator(specs, algo, contiguous, OutputLevel[args.output], out, args.lookahead if args.stream else None,
+                     args.frames, args.frames_per_line, args.memmove, metricsFile, CompactionPolicy[args.compaction],
+                     args.batch_steps, args.admission_queue, checkpointer)
+
+"""
+simulate a single memory configuration, collecting its output rather than printing it (used by worker processes)
+@param specs: the list of ProcessSpecs to simulate, or None to stream them from the input file
+@param algo: the MemoryAlgorithm to use for contiguous placement
+@param contiguous: whether memory is allocated contiguously (true) or through a page table (false)
+@param args: the parsed command line arguments
+@returns the full text output of the run
+"""
+def runConfiguration(specs, algo, contiguous, args):
+    stream = io.StringIO()
+    makeSimulator(specs if specs != None else iterTrace(args.inputFile), algo, contiguous, args, OutputWriter(stream)).run()
+    return stream.getvalue()
   
+"""
+make a checkpointer for one of the configurations being run, if we are checkpointing
+@param args: the parsed command line arguments
+@param index: the index of the configuration in args.configurations
+@param outputOffset: the number of characters of output written before the configuration's run began
+@returns the new Checkpointer, or None if we are not checkpointing
+"""
+def makeCheckpointer(args, index, outputOffset):
+    if (args.checkpoint == None):
+        return None
+    return Checkpointer(args.checkpoint, args.checkpoint_every, {"config": index, "configs": args.configs, "outputOffset": outputOffset})
+
+"""
+continue the run saved in the checkpoint file
+@param specs: the list of ProcessSpecs to simulate, or None to stream them from the input file
+@param args: the parsed command line arguments
+@returns the index of the first configuration still to run, and the number of characters of output written before it
+"""
+def resumeRun(specs, args):
+    try:
+        context, outputChars, sim = loadCheckpoint(args.checkpoint)
+    except (IOError, ValueError, EOFError, pickle.UnpicklingError) as e:
+        exitError("Cannot resume from {0}: {1}".format(args.checkpoint, e))
+    if (context["configs"] != args.configs):
+        exitError("the checkpoint was made with --configs {0}".format(' '.join(context["configs"])))
+    #whatever the interrupted run wrote after the checkpoint is written again, so its output should be cut short before appending ours
+    print("Resuming after the first {0} characters of output".format(context["outputOffset"] + outputChars), file=sys.stderr)
+
+    if (sim != None):
+        sim.specs = specs if specs != None else iterTrace(args.inputFile)
+        sim.out.charsWritten = outputChars
+        sim.checkpointer = makeCheckpointer(args, context["config"], context["outputOffset"])
+        sim.resume()
+        outputChars = sim.out.charsWritten
+    return (context["config"] + 1, context["outputOffset"] + outputChars)
+
 """
 main method: parse the input file while checking for errors, then start our simulator instance
 """      
@@ -38,36 +224,47 @@ def main():
     #make sure the user specifies the correct number of arguments
     if (len(sys.argv) < 2):
         exitError("ERROR: Invalid arguments\nUSAGE: /usr/bin/python3.5 project2.py p2-input01.txt")
+    args = parseArgs()
 
-    #extract our processes from the input file before beginning the simulation
-    processes = readInput(sys.argv[1])
-    
-    #run next-fit
-    Simulator.processes = copy.deepcopy(processes)
-    Simulator.algo = MemoryAlgorithm.nextFit
-    Simulator.run()
-    print()
+    #extract our processes from the input file before beginning the simulation (unless each run streams them itself)
+    specs = None
+    if (not args.stream):
+        specs = readInput(args.inputFile)
     
-    #run first-fit
-    Simulator.reset()
-    Simulator.processes = copy.deepcopy(processes)
-    Simulator.algo = MemoryAlgorithm.firstFit
-    Simulator.run()
-    print()
-    
-    #run best-fit
-    Simulator.reset()
-    Simulator.processes = copy.deepcopy(processes)
-    Simulator.algo = MemoryAlgorithm.bestFit
-    Simulator.run()
-    print()
-    
-    #run non-contiguous
-    Simulator.reset()
-    Simulator.processes = copy.deepcopy(processes)
-    Simulator.algo = None
-    Simulator.contiguous = False
-    Simulator.run()
+    try:
+        if (args.shardConfigurations != None):
+            #a fleet is simulated as a single run, however many shards it has
+            ShardedSimulator(specs if specs != None else iterTrace(args.inputFile), args.shardConfigurations, RoutingPolicy[args.routing],
+                             OutputLevel[args.output], None, args.lookahead if args.stream else None, args.frames_per_line, args.memmove,
+                             args.metrics, CompactionPolicy[args.compaction]).run()
+        elif (args.jobs > 1):
+            #run every configuration at once, each in its own process, then print their outputs in the usual order
+            with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                futures = [pool.submit(runConfiguration, specs, algo, contiguous, args) for algo, contiguous in args.configurations]
+                for i in range(len(futures)):
+                    if (i > 0):
+                        print()
+                    sys.stdout.write(futures[i].result())
+        else:
+            #when resuming, pick up part-way through the configuration that was interrupted
+            start, outputOffset = resumeRun(specs, args) if args.resume else (0, 0)
+
+            #run each configuration (by default next-fit, first-fit, best-fit and non-contiguous) one after another, printing as we go
+            #(every run shares the same parsed specs, since each run keeps its per-process state in its own Process records)
+            for i in range(start, len(args.configurations)):
+                if (i > 0):
+                    print()
+                    outputOffset += 1
+                algo, contiguous = args.configurations[i]
+                sim = makeSimulator(specs if specs != None else iterTrace(args.inputFile), algo, contiguous, args, None,
+                                    makeCheckpointer(args, i, outputOffset))
+                sim.run()
+                outputOffset += sim.out.charsWritten
+    #when streaming, invalid input is only discovered part-way through a run
+    except InputFormatError:
+        exitError("Invalid input file format")
+    except ArrivalOrderError as e:
+        exitError(e)
     
 if __name__ == "__main__":
     main()
\ No newline at end of file